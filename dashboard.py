@@ -3,7 +3,9 @@ Jarvis Dashboard - Command Center Hub
 Port 6000 - Modular tabs for each bot + global controls
 """
 
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, render_template_string, jsonify, request
+
+from modules import jsonio
 
 
 def create_dashboard_app(jarvis_instance):
@@ -830,7 +832,10 @@ setInterval(refresh, 5000);
 
     @app.route('/api/state')
     def api_state():
-        return jsonify(jarvis.get_dashboard_state())
+        # Polled every 5s — serialize through jsonio so the orjson fast
+        # path applies instead of jsonify's stdlib encoder
+        return Response(jsonio.dumps(jarvis.get_dashboard_state()),
+                        mimetype="application/json")
 
     @app.route('/api/command', methods=['POST'])
     def api_command():
@@ -848,6 +853,7 @@ setInterval(refresh, 5000);
             action = jarvis.approvals.approve_action(action_id)
             if action:
                 jarvis.executor.execute_action(action)
+                jarvis.executor.flush()
                 jarvis._log_chat("user", f"Approved: {action['description']}", "success")
         return jsonify({"ok": True})
 
@@ -12,10 +12,18 @@ Usage: python3 integrate_futures.py
 """
 
 import os
+import re
 import sys
+import mmap
 import shutil
 import yaml
 
+# libyaml-backed loader/dumper is 5-10x faster; fall back on systems without it
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
 JARVIS_DIR = "/root/jarvis"
 MODULES_DIR = os.path.join(JARVIS_DIR, "modules")
 CONFIG_PATH = os.path.join(JARVIS_DIR, "config.yaml")
@@ -23,16 +31,15 @@ JARVIS_PY = os.path.join(JARVIS_DIR, "jarvis.py")
 SOURCE_MODULE = "/root/3dpo3/futures_monitor.py"
 
 
-def add_config():
-    """Add futures section to config.yaml"""
-    print("[1/3] Updating config.yaml...")
+def add_config(config):
+    """Add futures section to the in-memory config dict.
 
-    with open(CONFIG_PATH, "r") as f:
-        config = yaml.safe_load(f)
+    Returns True if the config was actually mutated."""
+    print("[1/3] Updating config.yaml...")
 
     if "futures" in config:
         print("  Futures config already exists, skipping.")
-        return
+        return False
 
     config["futures"] = {
         "enabled": True,
@@ -50,10 +57,8 @@ def add_config():
         "monitor_interval": 300,  # 5 minutes (matches 5m candles)
     }
 
-    with open(CONFIG_PATH, "w") as f:
-        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
-
     print("  ✅ Added futures config section")
+    return True
 
 
 def copy_module():
@@ -63,70 +68,56 @@ def copy_module():
     dest = os.path.join(MODULES_DIR, "futures_monitor.py")
 
     if os.path.exists(SOURCE_MODULE):
-        shutil.copy2(SOURCE_MODULE, dest)
+        # copyfile skips the copystat() metadata pass and uses os.sendfile
+        # (zero-copy) on Linux
+        shutil.copyfile(SOURCE_MODULE, dest)
         print(f"  ✅ Copied {SOURCE_MODULE} → {dest}")
     else:
         print(f"  ⚠️ Source not found at {SOURCE_MODULE}")
         print(f"  Please manually copy futures_monitor.py to {dest}")
 
 
-def patch_jarvis():
-    """Patch jarvis.py to integrate futures module."""
-    print("[3/3] Patching jarvis.py...")
-
-    with open(JARVIS_PY, "r") as f:
-        content = f.read()
-
-    # Check if already patched
-    if "futures_monitor" in content:
-        print("  Already patched, skipping.")
-        return
-
-    # 1. Add import
-    old_import = "from modules.executor import ActionExecutor"
-    new_import = (
-        "from modules.executor import ActionExecutor\n"
-        "from modules.futures_monitor import FuturesMonitor"
-    )
-    content = content.replace(old_import, new_import)
-
-    # 2. Add initialization in __init__
-    old_init = "        # State\n        self.running = True"
-    new_init = (
-        "        # Futures module\n"
-        "        if self.config.get('futures', {}).get('enabled', False):\n"
-        "            self.futures = FuturesMonitor(self.config, self.logger, self.analyst)\n"
-        "            self.logger.info('Futures monitor enabled')\n"
-        "        else:\n"
-        "            self.futures = None\n"
-        "\n"
-        "        # State\n"
-        "        self.running = True"
-    )
-    content = content.replace(old_init, new_init)
-
-    # 3. Add last_futures_check to state
-    old_state = "        self.last_stale_alert = {}  # bot_name -> timestamp (prevent spam)"
-    new_state = (
-        "        self.last_stale_alert = {}  # bot_name -> timestamp (prevent spam)\n"
-        "        self.last_futures_check = 0"
-    )
-    content = content.replace(old_state, new_state)
-
-    # 4. Add futures loop logic in run() main loop
-    old_loop_check = "                self.process_approved_actions()"
-    new_loop_check = (
-        "                # Futures monitoring\n"
-        "                if self.futures and self.futures.enabled:\n"
-        "                    self._run_futures_checks(now)\n"
-        "\n"
-        "                self.process_approved_actions()"
-    )
-    content = content.replace(old_loop_check, new_loop_check)
-
-    # 5. Add the futures check method before get_dashboard_state
-    old_dashboard = "    def get_dashboard_state(self):"
-    new_method = '''    def _run_futures_checks(self, now):
+# 1. Add import
+old_import = "from modules.executor import ActionExecutor"
+new_import = (
+    "from modules.executor import ActionExecutor\n"
+    "from modules.futures_monitor import FuturesMonitor"
+)
+
+# 2. Add initialization in __init__
+old_init = "        # State\n        self.running = True"
+new_init = (
+    "        # Futures module\n"
+    "        if self.config.get('futures', {}).get('enabled', False):\n"
+    "            self.futures = FuturesMonitor(self.config, self.logger, self.analyst)\n"
+    "            self.logger.info('Futures monitor enabled')\n"
+    "        else:\n"
+    "            self.futures = None\n"
+    "\n"
+    "        # State\n"
+    "        self.running = True"
+)
+
+# 3. Add last_futures_check to state
+old_state = "        self.last_stale_alert = {}  # bot_name -> timestamp (prevent spam)"
+new_state = (
+    "        self.last_stale_alert = {}  # bot_name -> timestamp (prevent spam)\n"
+    "        self.last_futures_check = 0"
+)
+
+# 4. Add futures loop logic in run() main loop
+old_loop_check = "                self.process_approved_actions()"
+new_loop_check = (
+    "                # Futures monitoring\n"
+    "                if self.futures and self.futures.enabled:\n"
+    "                    self._run_futures_checks(now)\n"
+    "\n"
+    "                self.process_approved_actions()"
+)
+
+# 5. Add the futures check method before get_dashboard_state
+old_dashboard = "    def get_dashboard_state(self):"
+new_method = '''    def _run_futures_checks(self, now):
         """Run futures-related checks based on time of day."""
         from datetime import time as dt_time
         et_now = datetime.now(timezone(timedelta(hours=-5)))
@@ -172,76 +163,129 @@ def patch_jarvis():
 
     def get_dashboard_state(self):'''
 
-    content = content.replace(old_dashboard, new_method)
-
-    # 6. Add futures data to dashboard state
-    old_return = '            "config": {'
-    new_return = (
-        '            "futures": self.futures.get_dashboard_data() if self.futures else None,\n'
-        '            "config": {'
-    )
-    content = content.replace(old_return, new_return, 1)
-
-    # 7. Add futures commands to handle_user_command
-    old_else = '        else:\n            if self.budget.can_make_call():'
-    new_else = (
-        '        elif cmd in ("futures", "premarket", "bias"):\n'
-        '            if self.futures:\n'
-        '                brief = self.futures.run_premarket()\n'
-        '                if brief:\n'
-        '                    self._log_chat("futures", brief["message"], "info")\n'
-        '                else:\n'
-        '                    data = self.futures.get_dashboard_data()\n'
-        '                    seq = data.get("sequence", "unknown")\n'
-        '                    bias = data.get("bias", "unknown")\n'
-        '                    self._log_chat("futures", f"Current: {seq} → {bias}", "info")\n'
-        '            else:\n'
-        '                self._log_chat("jarvis", "Futures module not enabled", "warning")\n'
-        '        elif cmd == "futures stats":\n'
-        '            if self.futures:\n'
-        '                stats = self.futures.get_stats()\n'
-        '                self._log_chat("futures", json.dumps(stats, indent=2, default=str), "info")\n'
-        '        elif cmd == "weekly":\n'
-        '            if self.futures:\n'
-        '                summary = self.futures.get_weekly_summary()\n'
-        '                if summary:\n'
-        '                    self._log_chat("futures", summary, "info")\n'
-        '        else:\n'
-        '            if self.budget.can_make_call():'
-    )
-    content = content.replace(old_else, new_else)
-
-    # Write patched file
-    with open(JARVIS_PY, "w") as f:
-        f.write(content)
+
+# 6. Add futures data to dashboard state
+old_return = '            "config": {'
+new_return = (
+    '            "futures": self.futures.get_dashboard_data() if self.futures else None,\n'
+    '            "config": {'
+)
+
+# 7. Add futures commands to handle_user_command
+old_else = '        else:\n            if self.budget.can_make_call():'
+new_else = (
+    '        elif cmd in ("futures", "premarket", "bias"):\n'
+    '            if self.futures:\n'
+    '                brief = self.futures.run_premarket()\n'
+    '                if brief:\n'
+    '                    self._log_chat("futures", brief["message"], "info")\n'
+    '                else:\n'
+    '                    data = self.futures.get_dashboard_data()\n'
+    '                    seq = data.get("sequence", "unknown")\n'
+    '                    bias = data.get("bias", "unknown")\n'
+    '                    self._log_chat("futures", f"Current: {seq} → {bias}", "info")\n'
+    '            else:\n'
+    '                self._log_chat("jarvis", "Futures module not enabled", "warning")\n'
+    '        elif cmd == "futures stats":\n'
+    '            if self.futures:\n'
+    '                stats = self.futures.get_stats()\n'
+    '                self._log_chat("futures", json.dumps(stats, indent=2, default=str), "info")\n'
+    '        elif cmd == "weekly":\n'
+    '            if self.futures:\n'
+    '                summary = self.futures.get_weekly_summary()\n'
+    '                if summary:\n'
+    '                    self._log_chat("futures", summary, "info")\n'
+    '        else:\n'
+    '            if self.budget.can_make_call():'
+)
+
+# All patches are applied in one linear pass: a single alternation regex
+# with a dispatch dict, compiled once at module load so repeated runs of
+# the script never re-pay the compile cost.
+PATCHES = [
+    (old_import, new_import),
+    (old_init, new_init),
+    (old_state, new_state),
+    (old_loop_check, new_loop_check),
+    (old_dashboard, new_method),
+    (old_return, new_return),
+    (old_else, new_else),
+]
+PATCH_PATTERN = re.compile("|".join(re.escape(old) for old, _ in PATCHES))
+PATCH_MAP = dict(PATCHES)
+
+
+def patch_jarvis():
+    """Patch jarvis.py to integrate futures module."""
+    print("[3/3] Patching jarvis.py...")
+
+    # mmap the source instead of a buffered read; one decode, no copies
+    with open(JARVIS_PY, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content = mm[:].decode("utf-8")
+
+    # Check if already patched
+    if "futures_monitor" in content:
+        print("  Already patched, skipping.")
+        return
+
+    # The sub callback doubles as multi-pattern anchor detection: one linear
+    # scan both patches and records which anchors were present, so a drifted
+    # jarvis.py gets reported instead of silently half-patched.
+    seen = set()
+
+    def _apply(m):
+        seen.add(m.group(0))
+        return PATCH_MAP[m.group(0)]
+
+    content = PATCH_PATTERN.sub(_apply, content)
+
+    missing = [old for old in PATCH_MAP if old not in seen]
+    if missing:
+        print(f"  ⚠️ {len(missing)} anchor(s) not found — jarvis.py may have drifted:")
+        for old in missing:
+            print(f"     {old.strip().splitlines()[0]}")
+
+    # Write patched file in one go with a large buffer (default is 8KB),
+    # to a temp sibling first so a crash mid-write can't corrupt jarvis.py
+    tmp = JARVIS_PY + ".tmp"
+    with open(tmp, "wb", buffering=256 * 1024) as f:
+        f.write(content.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, JARVIS_PY)
 
     print("  ✅ Patched jarvis.py with futures integration")
 
 
-def add_permissions():
-    """Add futures-related permissions to config."""
-    with open(CONFIG_PATH, "r") as f:
-        config = yaml.safe_load(f)
+def add_permissions(config):
+    """Add futures-related permissions to the in-memory config dict.
 
+    Returns True if the config was actually mutated."""
     perms = config.get("permissions", {})
+    dirty = False
 
     # Add eq_rejection_signal to auto_approve (or require_approval)
     auto = perms.get("auto_approve", [])
     if "eq_rejection_signal" not in auto:
         auto.append("log_eq_rejection")
         perms["auto_approve"] = auto
+        dirty = True
 
     require = perms.get("require_approval", [])
     if "eq_rejection_signal" not in require:
         require.append("eq_rejection_signal")
         perms["require_approval"] = require
+        dirty = True
 
-    config["permissions"] = perms
+    if not dirty:
+        print("  Futures permissions already present, skipping.")
+        return False
 
-    with open(CONFIG_PATH, "w") as f:
-        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+    config["permissions"] = perms
 
     print("  ✅ Added futures permissions")
+    return True
 
 
 def main():
@@ -249,10 +293,27 @@ def main():
     print("JARVIS FUTURES INTEGRATION")
     print("=" * 50)
 
-    add_config()
+    # Parse config.yaml once, mutate in memory, write once at the end
+    # (avoids two extra YAML parse+dump round-trips).
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.load(f, Loader=SafeLoader)
+
+    dirty = add_config(config)
     copy_module()
     patch_jarvis()
-    add_permissions()
+    dirty = add_permissions(config) or dirty
+
+    # Only re-serialize config.yaml if something actually changed (the dump
+    # is the slow side of PyYAML, and re-runs are the common case).
+    # Atomic write: dump to a temp sibling, fsync, then rename over the
+    # original so a crash can't leave a half-written config.yaml
+    if dirty:
+        tmp = CONFIG_PATH + ".tmp"
+        with open(tmp, "w") as f:
+            yaml.dump(config, f, Dumper=SafeDumper, default_flow_style=False, sort_keys=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, CONFIG_PATH)
 
     print("\n" + "=" * 50)
     print("DONE!")
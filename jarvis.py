@@ -19,16 +19,43 @@ import sys
 import os
 import json
 import time
+import heapq
 import logging
 import signal
 import threading
+import traceback
 import yaml
 import sqlite3
-from datetime import datetime, timezone, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# libyaml-backed loader is 5-10x faster; fall back on systems without it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+from datetime import datetime, timezone, timedelta, time as dt_time
 from zoneinfo import ZoneInfo
 
+# ET clock + session anchors, built once instead of per loop tick.
+# ZoneInfo tracks DST (the fixed UTC-5 offset was wrong half the year).
+ET_TZ = ZoneInfo("America/New_York")
+FUTURES_PREMARKET = dt_time(9, 25)
+FUTURES_SESSION_START = dt_time(9, 30)
+FUTURES_SESSION_END = dt_time(11, 0)
+FUTURES_POSTSESSION = dt_time(11, 15)
+FUTURES_POSTSESSION_END = dt_time(11, 30)
+
+SETTLE_SQL = (
+    "SELECT COUNT(*) FROM trades "
+    "WHERE settled = 1 AND order_id IS NOT NULL "
+    "AND settle_time > datetime('now', '-60 minutes')"
+)
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from modules import jsonio
 from modules.watchdog import Watchdog
 from modules.analyst import Analyst
 from modules.budget_tracker import BudgetTracker
@@ -41,6 +68,15 @@ from modules.strategies_monitor import StrategiesMonitor
 from modules.telegram_listener import TelegramListener
 from modules.korean_tracker import morning_brief_line, weekly_summary as korean_weekly
 
+from dashboard import create_dashboard_app
+
+# waitress serves the dashboard with real thread concurrency; Flask's dev
+# server is single-threaded and serializes every poll behind the last one
+try:
+    from waitress import serve as waitress_serve
+except ImportError:
+    waitress_serve = None
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -75,7 +111,7 @@ class Jarvis:
 
         config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
         with open(config_path, "r") as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=YamlLoader)
 
         # Initialize modules
         self.budget = BudgetTracker(self.config, self.logger)
@@ -111,18 +147,49 @@ class Jarvis:
 
         # State
         self.running = True
-        self.last_analysis_time = 0
-        self.last_stats_time = 0
-        self.last_health_check = 0
-        self.last_settlement_check = 0
         self.bot_health = {}
         self.bot_stats = {}
-        self.chat_log = []
+        self._stats_version = 0
+        self._stats_json_cache = ("", -1)  # (json, version) — see handle_user_command
+        self.chat_log = deque(maxlen=200)  # O(1) append with auto-eviction
         self.last_stale_alert = {}  # bot_name -> timestamp (prevent spam)
         self.last_futures_check = 0
         self._last_strategies_check_date = None
         self._last_korean_check_date = None
 
+        # Bot DBs are independent files, so per-bot reads overlap cleanly
+        self._bot_pool = ThreadPoolExecutor(
+            max_workers=min(8, max(1, len(self.config["bots"]))),
+            thread_name_prefix="botio"
+        )
+
+        # Persistent per-bot DB connections for settlement checks — opening
+        # and tearing down a connection per bot per tick costs more than the
+        # COUNT query itself
+        self._bot_conns = {}
+        for bot_name, bot_config in self.config["bots"].items():
+            if bot_config.get("enabled"):
+                try:
+                    conn = sqlite3.connect(
+                        bot_config["db_path"], check_same_thread=False, isolation_level=None
+                    )
+                    # WAL keeps our reads from serializing behind the bot's
+                    # writer transactions
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute("PRAGMA temp_store=MEMORY")
+                    try:
+                        # Turns the settlement COUNT into an index range scan
+                        conn.execute(
+                            "CREATE INDEX IF NOT EXISTS idx_trades_settle "
+                            "ON trades(settled, settle_time) WHERE order_id IS NOT NULL"
+                        )
+                    except sqlite3.OperationalError:
+                        pass  # trades table not created yet
+                    self._bot_conns[bot_name] = conn
+                except Exception as e:
+                    self.logger.warning(f"Could not open {bot_name} DB: {e}")
+
         # Initialize git repo
         self.git.init_repo()
 
@@ -138,19 +205,51 @@ class Jarvis:
         except:
             pass
 
+        # Scheduler intervals, resolved once instead of chained dict lookups
+        self._hb_interval = self.config["watchdog"]["heartbeat_interval"]
+        self._settle_interval = self.config["watchdog"]["settlement_check_interval"]
+        self._stats_interval = self.config["watchdog"]["stats_interval"]
+        self._analysis_interval = self.config["haiku"]["analysis_interval"]
+
+        # O(1) command dispatch — exact matches first, then "<verb> <bot>"
+        # prefix commands (see handle_user_command)
+        self._commands = {
+            "status": self._cmd_status,
+            "health": self._cmd_status,
+            "analyze": self._cmd_analyze,
+            "analysis": self._cmd_analyze,
+            "budget": self._cmd_budget,
+            "futures": self._cmd_futures,
+            "premarket": self._cmd_futures,
+            "bias": self._cmd_futures,
+            "futures stats": self._cmd_futures_stats,
+            "weekly": self._cmd_weekly,
+        }
+        self._prefix_commands = {
+            "pause": self._cmd_pause,
+            "resume": self._cmd_resume,
+        }
+
+        # Bot list is immutable at runtime; build the dashboard projection once
+        self._config_bots_projection = {
+            k: {
+                "name": v["name"],
+                "enabled": v.get("enabled", True),
+                "dashboard_port": v.get("dashboard_port")
+            } for k, v in self.config["bots"].items()
+        }
+
         self.logger.info("All modules initialized")
         self.logger.info(f"Monitoring: {', '.join(n for n, c in self.config['bots'].items() if c.get('enabled'))}")
 
     def _log_chat(self, source, message, level="info"):
         entry = {
-            "time": datetime.now(timezone(timedelta(hours=-5))).strftime("%I:%M:%S %p"),
+            "time": datetime.now(ET_TZ).strftime("%I:%M:%S %p"),
             "source": source,
             "message": message,
             "level": level
         }
         self.chat_log.append(entry)
-        if len(self.chat_log) > 200:
-            self.chat_log = self.chat_log[-200:]
 
     def check_health(self):
         self.bot_health = self.watchdog.get_full_health_report(self.config["bots"])
@@ -190,11 +289,15 @@ class Jarvis:
     def check_loss_streaks(self):
         max_losses = self.config["safety"]["max_consecutive_losses"]
 
-        for bot_name, bot_config in self.config["bots"].items():
-            if not bot_config.get("enabled"):
-                continue
+        enabled = {n: c for n, c in self.config["bots"].items() if c.get("enabled")}
+        futures = {
+            n: self._bot_pool.submit(self.analyst._detect_loss_streak, c["db_path"])
+            for n, c in enabled.items()
+        }
 
-            streak = self.analyst._detect_loss_streak(bot_config["db_path"])
+        for bot_name, fut in futures.items():
+            bot_config = enabled[bot_name]
+            streak = fut.result()
 
             if streak >= max_losses:
                 self._log_chat("analyst", f"🚨 {bot_name}: {streak} consecutive losses!", "error")
@@ -220,31 +323,31 @@ class Jarvis:
                                 self._log_chat("haiku", analysis.get("diagnosis", ""), "info")
 
     def check_settlements(self):
-        for bot_name, bot_config in self.config["bots"].items():
-            if not bot_config.get("enabled"):
-                continue
+        futures = {
+            bot_name: self._bot_pool.submit(
+                lambda c: c.execute(SETTLE_SQL).fetchone()[0], conn)
+            for bot_name, conn in self._bot_conns.items()
+        }
+        for bot_name, fut in futures.items():
             try:
-                conn = sqlite3.connect(bot_config["db_path"])
-                c = conn.cursor()
-                c.execute("""
-                    SELECT COUNT(*) FROM trades
-                    WHERE settled = 1 AND order_id IS NOT NULL
-                    AND settle_time > datetime('now', '-60 minutes')
-                """)
-                unredeemed = c.fetchone()[0]
-                conn.close()
+                unredeemed = fut.result()
                 if unredeemed > 0:
                     self._log_chat("watchdog", f"💰 {bot_name}: {unredeemed} unredeemed", "info")
             except:
                 pass
 
     def calculate_stats(self):
-        for bot_name, bot_config in self.config["bots"].items():
-            if not bot_config.get("enabled"):
-                continue
-            stats = self.analyst._get_rolling_stats(bot_config["db_path"], window=50)
+        futures = {
+            bot_name: self._bot_pool.submit(
+                self.analyst._get_rolling_stats, bot_config["db_path"], window=50)
+            for bot_name, bot_config in self.config["bots"].items()
+            if bot_config.get("enabled")
+        }
+        for bot_name, fut in futures.items():
+            stats = fut.result()
             if stats:
                 self.bot_stats[bot_name] = stats
+        self._stats_version += 1
 
     def run_scheduled_analysis(self):
         analysis = self.analyst.run_scheduled_analysis(self.config["bots"])
@@ -289,30 +392,50 @@ class Jarvis:
             if action["status"] == "approved":
                 result = self.executor.execute_action(action)
                 self._log_chat("jarvis", f"✅ Executed: {action['description']}", "success")
+        # One sync + commit for the whole batch
+        self.executor.flush()
+
+    def _settlement_tick(self):
+        self.check_settlements()
+        self.check_loss_streaks()
+
+    def _fast_tick(self):
+        now = time.time()
+
+        # Futures monitoring
+        if self.futures and self.futures.enabled:
+            self._run_futures_checks(now)
+
+        # Strategies monitoring (Ghost + Surge)
+        if self.strategies and self.strategies.enabled:
+            self._run_strategies_checks(now)
+
+        # Korean learning check (morning nudge)
+        self._run_korean_check()
+
+        self.process_approved_actions()
 
     def _run_futures_checks(self, now):
         """Run futures-related checks based on time of day."""
-        from datetime import time as dt_time
-        et_now = datetime.now(ZoneInfo("America/New_York"))
+        et_now = datetime.now(ET_TZ)
         if et_now.weekday() >= 5:
             return
         current_time = et_now.time()
 
-        ft_config = self.config.get("futures", {})
-        premarket = dt_time(9, 25)
-        session_start = dt_time(9, 30)
-        session_end = dt_time(11, 0)
-        postsession = dt_time(11, 15)
-        monitor_interval = ft_config.get("monitor_interval", 300)
+        # Outside 9:25-11:30 ET (~95% of the day) nothing below can fire
+        if current_time < FUTURES_PREMARKET or current_time >= FUTURES_POSTSESSION_END:
+            return
+
+        monitor_interval = self.config.get("futures", {}).get("monitor_interval", 300)
 
         # Pre-market brief (9:25 AM ET — fires once per day)
-        if current_time >= premarket and current_time < session_start:
+        if current_time >= FUTURES_PREMARKET and current_time < FUTURES_SESSION_START:
             brief = self.futures.run_premarket()
             if brief:
                 self._log_chat("futures", brief["message"], "info")
 
         # Live session monitoring (9:30-11:00, every 5 min)
-        if current_time >= session_start and current_time <= session_end:
+        if current_time >= FUTURES_SESSION_START and current_time <= FUTURES_SESSION_END:
             if now - self.last_futures_check >= monitor_interval:
                 signal = self.futures.check_eq_rejection()
                 if signal:
@@ -328,7 +451,7 @@ class Jarvis:
                 self.last_futures_check = now
 
         # Post-session (11:15 AM ET)
-        if current_time >= postsession and current_time < dt_time(11, 30):
+        if current_time >= FUTURES_POSTSESSION and current_time < FUTURES_POSTSESSION_END:
             summary = self.futures.run_postsession()
             if summary:
                 fired = "Signal fired" if summary["signal_fired"] else "No signal"
@@ -338,8 +461,7 @@ class Jarvis:
 
     def _run_korean_check(self):
         """Fire once per day in morning — nudge if 언니 hasn't practiced."""
-        from datetime import time as dt_time
-        et_now = datetime.now(ZoneInfo("America/New_York"))
+        et_now = datetime.now(ET_TZ)
         if et_now.weekday() >= 5:
             return
         today_str = et_now.strftime("%Y-%m-%d")
@@ -353,8 +475,7 @@ class Jarvis:
 
     def _run_strategies_checks(self, now):
         """Run Ghost + Surge daily check once after 4:15 PM ET."""
-        from datetime import time as dt_time
-        et_now = datetime.now(ZoneInfo("America/New_York"))
+        et_now = datetime.now(ET_TZ)
         current_time = et_now.time()
         today_str = et_now.strftime("%Y-%m-%d")
 
@@ -371,104 +492,126 @@ class Jarvis:
             "stats": self.bot_stats,
             "budget": self.budget.get_dashboard_data(),
             "approvals": self.approvals.get_dashboard_data(),
-            "chat_log": self.chat_log[-50:],
+            "chat_log": list(self.chat_log)[-50:],
             "git_commits": self.git.get_recent_commits(10),
             "futures": self.futures.get_dashboard_data() if self.futures else None,
             "strategies": self.strategies.get_dashboard_data() if self.strategies else None,
-            "config": {
-                "bots": {k: {
-                    "name": v["name"],
-                    "enabled": v.get("enabled", True),
-                    "dashboard_port": v.get("dashboard_port")
-                } for k, v in self.config["bots"].items()}
-            }
+            "config": {"bots": self._config_bots_projection}
         }
 
     def handle_user_command(self, command_text):
         self._log_chat("user", command_text, "info")
         cmd = command_text.strip().lower()
 
-        if cmd in ("status", "health"):
-            self.check_health()
-            self._log_chat("jarvis", "Health check complete", "info")
-        elif cmd.startswith("pause "):
-            bot = cmd.split(" ", 1)[1].strip()
-            if bot in self.config["bots"]:
-                self.executor._pause_bot(bot, {"reason": "user_command"})
-                self._log_chat("jarvis", f"⏸️ Paused {bot}", "success")
-            else:
-                self._log_chat("jarvis", f"Unknown bot: {bot}", "error")
-        elif cmd.startswith("resume "):
-            bot = cmd.split(" ", 1)[1].strip()
-            if bot in self.config["bots"]:
-                self.executor._resume_bot(bot, {})
-                self._log_chat("jarvis", f"▶️ Resumed {bot}", "success")
-            else:
-                self._log_chat("jarvis", f"Unknown bot: {bot}", "error")
-        elif cmd in ("analyze", "analysis"):
-            self._log_chat("jarvis", "Running analysis...", "info")
-            self.run_scheduled_analysis()
-        elif cmd == "budget":
-            data = self.budget.get_dashboard_data()
-            d, m = data["daily"], data["monthly"]
-            self._log_chat("jarvis",
-                f"Today: ${d['cost']:.4f}/{d['limit']} ({d['calls']} calls) | Month: ${m['cost']:.4f}/{m['limit']}", "info")
-        elif cmd in ("futures", "premarket", "bias"):
-            if self.futures:
-                brief = self.futures.run_premarket(force=True)
-                if brief:
-                    self._log_chat("futures", brief["message"], "info")
-                else:
-                    data = self.futures.get_dashboard_data()
-                    seq = data.get("sequence", "unknown")
-                    bias = data.get("bias", "unknown")
-                    self._log_chat("futures", f"Current: {seq} → {bias}", "info")
+        handler = self._commands.get(cmd)
+        if handler:
+            handler()
+            return
+
+        head, _, arg = cmd.partition(" ")
+        prefix_handler = self._prefix_commands.get(head)
+        if prefix_handler and arg:
+            prefix_handler(arg.strip())
+            return
+
+        self._cmd_ask_haiku(command_text)
+
+    def _cmd_status(self):
+        self.check_health()
+        self._log_chat("jarvis", "Health check complete", "info")
+
+    def _cmd_pause(self, bot):
+        if bot in self.config["bots"]:
+            self.executor._pause_bot(self.executor._bot_ctx(bot), {"reason": "user_command"})
+            self._log_chat("jarvis", f"⏸️ Paused {bot}", "success")
+        else:
+            self._log_chat("jarvis", f"Unknown bot: {bot}", "error")
+
+    def _cmd_resume(self, bot):
+        if bot in self.config["bots"]:
+            self.executor._resume_bot(self.executor._bot_ctx(bot), {})
+            self._log_chat("jarvis", f"▶️ Resumed {bot}", "success")
+        else:
+            self._log_chat("jarvis", f"Unknown bot: {bot}", "error")
+
+    def _cmd_analyze(self):
+        self._log_chat("jarvis", "Running analysis...", "info")
+        self.run_scheduled_analysis()
+
+    def _cmd_budget(self):
+        data = self.budget.get_dashboard_data()
+        d, m = data["daily"], data["monthly"]
+        self._log_chat("jarvis",
+            f"Today: ${d['cost']:.4f}/{d['limit']} ({d['calls']} calls) | Month: ${m['cost']:.4f}/{m['limit']}", "info")
+
+    def _cmd_futures(self):
+        if self.futures:
+            brief = self.futures.run_premarket(force=True)
+            if brief:
+                self._log_chat("futures", brief["message"], "info")
             else:
-                self._log_chat("jarvis", "Futures module not enabled", "warning")
-        elif cmd == "futures stats":
-            if self.futures:
-                stats = self.futures.get_stats()
-                self._log_chat("futures", json.dumps(stats, indent=2, default=str), "info")
-        elif cmd == "weekly":
-            if self.futures:
-                summary = self.futures.get_weekly_summary()
-                if summary:
-                    self._log_chat("futures", summary, "info")
-            kr = korean_weekly()
-            self._log_chat("seoyeon", kr, "info")
-            self.listener.send(kr)
+                data = self.futures.get_dashboard_data()
+                seq = data.get("sequence", "unknown")
+                bias = data.get("bias", "unknown")
+                self._log_chat("futures", f"Current: {seq} → {bias}", "info")
         else:
-            if self.budget.can_make_call():
-                self._log_chat("jarvis", "Asking Haiku...", "info")
-                stats_summary = json.dumps(self.bot_stats, default=str)
-                response = self.analyst._call_haiku(
-                    "You are Jarvis, a trading bot manager. Answer concisely based on the data. Keep under 3 sentences.",
-                    f"User asks: {command_text}\n\nBot stats: {stats_summary}"
-                )
-                if response:
-                    self._log_chat("haiku", response, "info")
-                else:
-                    self._log_chat("jarvis", "Haiku unavailable", "warning")
+            self._log_chat("jarvis", "Futures module not enabled", "warning")
+
+    def _cmd_futures_stats(self):
+        if self.futures:
+            stats = self.futures.get_stats()
+            self._log_chat("futures", jsonio.dumps(stats, indent=True), "info")
+
+    def _cmd_weekly(self):
+        if self.futures:
+            summary = self.futures.get_weekly_summary()
+            if summary:
+                self._log_chat("futures", summary, "info")
+        kr = korean_weekly()
+        self._log_chat("seoyeon", kr, "info")
+        self.listener.send(kr)
+
+    def _cmd_ask_haiku(self, command_text):
+        if self.budget.can_make_call():
+            self._log_chat("jarvis", "Asking Haiku...", "info")
+            # bot_stats only changes at calculate_stats ticks; reuse the
+            # serialized form until the version bumps
+            if self._stats_json_cache[1] != self._stats_version:
+                self._stats_json_cache = (json.dumps(self.bot_stats, default=str),
+                                          self._stats_version)
+            stats_summary = self._stats_json_cache[0]
+            response = self.analyst._call_haiku(
+                "You are Jarvis, a trading bot manager. Answer concisely based on the data. Keep under 3 sentences.",
+                f"User asks: {command_text}\n\nBot stats: {stats_summary}"
+            )
+            if response:
+                self._log_chat("haiku", response, "info")
             else:
-                self._log_chat("jarvis", "Budget limit reached", "warning")
+                self._log_chat("jarvis", "Haiku unavailable", "warning")
+        else:
+            self._log_chat("jarvis", "Budget limit reached", "warning")
 
     def run(self):
         self.logger.info("Main loop starting")
         self._log_chat("jarvis", "🤖 Jarvis online. Monitoring all systems.", "success")
 
-        from dashboard import create_dashboard_app
         dashboard_app = create_dashboard_app(self)
-        dash_thread = threading.Thread(
-            target=lambda: dashboard_app.run(
+        dash_port = self.config.get("jarvis_port", 6000)
+        if waitress_serve:
+            serve_dashboard = lambda: waitress_serve(
+                dashboard_app, host="0.0.0.0", port=dash_port, threads=8
+            )
+        else:
+            serve_dashboard = lambda: dashboard_app.run(
                 host="0.0.0.0",
-                port=self.config.get("jarvis_port", 6000),
+                port=dash_port,
                 debug=False,
                 use_reloader=False
-            ),
-            daemon=True
-        )
+            )
+        dash_thread = threading.Thread(target=serve_dashboard, daemon=True)
         dash_thread.start()
-        self.logger.info(f"Dashboard on port {self.config.get('jarvis_port', 6000)}")
+        self.logger.info(f"Dashboard on port {dash_port}"
+                         + ("" if waitress_serve else " (waitress not installed — dev server)"))
 
         import os as _os
         _tg_listen = self.config.get("telegram", {}).get("listen", True)
@@ -480,50 +623,48 @@ class Jarvis:
         self.check_health()
         self.calculate_stats()
 
+        # Heap scheduler: (next_due, seq, callback, interval) entries, popped
+        # in due order. Sleeps exactly until the next due task instead of
+        # waking every 5s to diff four timestamps. The 5s tick keeps the
+        # approval queue and time-of-day checks (futures/strategies/korean)
+        # responsive.
+        now = time.time()
+        tasks = [
+            (now + self._hb_interval, self.check_health, self._hb_interval),
+            (now, self._settlement_tick, self._settle_interval),
+            (now + self._stats_interval, self.calculate_stats, self._stats_interval),
+            (now, self.run_scheduled_analysis, self._analysis_interval),
+            (now, self._fast_tick, 5),
+        ]
+        heap = [(due, seq, cb, interval) for seq, (due, cb, interval) in enumerate(tasks)]
+        heapq.heapify(heap)
+
         while self.running:
             try:
-                now = time.time()
-
-                if now - self.last_health_check >= self.config["watchdog"]["heartbeat_interval"]:
-                    self.check_health()
-                    self.last_health_check = now
-
-                if now - self.last_settlement_check >= self.config["watchdog"]["settlement_check_interval"]:
-                    self.check_settlements()
-                    self.check_loss_streaks()
-                    self.last_settlement_check = now
-
-                if now - self.last_stats_time >= self.config["watchdog"]["stats_interval"]:
-                    self.calculate_stats()
-                    self.last_stats_time = now
-
-                if now - self.last_analysis_time >= self.config["haiku"]["analysis_interval"]:
-                    self.run_scheduled_analysis()
-                    self.last_analysis_time = now
-
-                # Futures monitoring
-                if self.futures and self.futures.enabled:
-                    self._run_futures_checks(now)
-
-                # Strategies monitoring (Ghost + Surge)
-                if self.strategies and self.strategies.enabled:
-                    self._run_strategies_checks(now)
-
-                # Korean learning check (morning nudge)
-                self._run_korean_check()
-
-                self.process_approved_actions()
-                time.sleep(5)
+                due, seq, cb, interval = heap[0]
+                delay = due - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                    continue
+                # Reschedule before running so a crashing task stays alive
+                heapq.heapreplace(heap, (time.time() + interval, seq, cb, interval))
+                cb()
 
             except KeyboardInterrupt:
                 self.logger.info("Shutting down...")
                 self.running = False
             except Exception as e:
                 self.logger.error(f"Main loop error: {e}")
-                import traceback
                 traceback.print_exc()
                 time.sleep(10)
 
+        self._bot_pool.shutdown(wait=False)
+        for conn in self._bot_conns.values():
+            try:
+                conn.close()
+            except:
+                pass
+
         self.logger.info("Jarvis shut down")
 
 
@@ -5,10 +5,96 @@ Reads memory, analyzes patterns, recommends changes.
 """
 
 import os
-import json
+import re
 import sqlite3
 import time
-from datetime import datetime, timezone, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from modules import jsonio
+
+# Haiku sometimes wraps the JSON object in prose or ```json fences; these
+# locate it in a single scan instead of find/rfind/strip passes
+_JSON_OBJ_RE = re.compile(r"\{.*\}", re.DOTALL)
+_FENCED_JSON_RE = re.compile(r"^\s*(?:```(?:json)?)?\s*(\{.*\})\s*(?:```)?\s*$", re.DOTALL)
+
+# Built once — same DST-aware Eastern zone the daemon's session windows use
+_ET = ZoneInfo("America/New_York")
+
+# SQL lives at module level so the statement cache keys on stable string
+# objects instead of re-built literals inside the hot functions
+_RECENT_TRADES_SQL = """
+    SELECT id, timestamp AS time, asset, side, entry_price AS entry,
+           binance_movement AS movement, stake, settled, won, pnl
+    FROM trades
+    ORDER BY id DESC
+    LIMIT ?
+"""
+
+_ROLLING_STATS_SQL = """
+    SELECT COUNT(*) as total,
+           SUM(CASE WHEN won = 1 THEN 1 ELSE 0 END) as wins,
+           SUM(pnl) as total_pnl,
+           AVG(entry_price) as avg_entry,
+           AVG(ABS(binance_movement)) as avg_movement
+    FROM (
+        SELECT won, pnl, entry_price, binance_movement FROM trades
+        WHERE settled = 1
+        ORDER BY id DESC
+        LIMIT ?
+    )
+"""
+
+_LOSS_STREAK_SQL = """
+    SELECT COUNT(*) FROM (
+        SELECT SUM(won) OVER (
+            ORDER BY id DESC
+            ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+        ) AS running_wins
+        FROM trades
+        WHERE settled = 1
+        ORDER BY id DESC
+        LIMIT 10
+    ) WHERE running_wins = 0
+"""
+
+_LOSS_STREAK_FALLBACK_SQL = """
+    SELECT won FROM trades
+    WHERE settled = 1
+    ORDER BY id DESC
+    LIMIT 10
+"""
+
+# Persistent read-only connection per bot DB — the connect() itself is the
+# dominant cost of these small analysis queries on slow disks
+_CONN_CACHE = {}
+_CONN_LOCK = threading.Lock()
+
+
+def _get_conn(db_path):
+    with _CONN_LOCK:
+        conn = _CONN_CACHE.get(db_path)
+        if conn is None:
+            try:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True,
+                                       check_same_thread=False,
+                                       cached_statements=128)
+                conn.execute("PRAGMA query_only=1")
+            except sqlite3.OperationalError:
+                # DB may not exist yet — fall back to a normal open
+                conn = sqlite3.connect(db_path, check_same_thread=False,
+                                       cached_statements=128)
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")
+            conn.row_factory = sqlite3.Row
+            _CONN_CACHE[db_path] = conn
+        return conn
 
 
 class Analyst:
@@ -24,6 +110,38 @@ class Analyst:
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "memory", "jarvis_memory.md"
         )
+        self._memory_cache = (None, None)  # (mtime, text)
+
+        # One-time: lets the settled-trades queries run as a backward
+        # index scan instead of a full scan + temp sort
+        for bot_config in config.get("bots", {}).values():
+            db_path = bot_config.get("db_path")
+            if not db_path or not os.path.exists(db_path):
+                continue
+            try:
+                conn = sqlite3.connect(db_path)
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_trades_settled_id "
+                    "ON trades(settled, id DESC)"
+                )
+                conn.commit()
+                conn.close()
+            except sqlite3.OperationalError:
+                pass
+
+        # Pooled HTTPS session: keep-alive + TLS resumption skip the 2-3 RTT
+        # handshake on every Haiku call after the first
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=2, pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
+        self._session.headers.update({
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        })
 
     def _call_haiku(self, system_prompt, user_prompt):
         """Make API call to Claude Haiku"""
@@ -37,15 +155,8 @@ class Analyst:
             return None
 
         try:
-            import requests
-
-            resp = requests.post(
+            resp = self._session.post(
                 "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
                 json={
                     "model": self.model,
                     "max_tokens": self.max_tokens,
@@ -55,7 +166,7 @@ class Analyst:
                         {"role": "user", "content": user_prompt}
                     ]
                 },
-                timeout=30
+                timeout=(5, 30)
             )
 
             if resp.status_code != 200:
@@ -84,95 +195,93 @@ class Analyst:
             return None
 
     def _read_memory(self):
-        """Read current memory file"""
+        """Read current memory file (cached until the file's mtime changes)"""
         try:
+            mtime = os.path.getmtime(self.memory_path)
+            if self._memory_cache[0] == mtime:
+                return self._memory_cache[1]
             with open(self.memory_path, "r") as f:
-                return f.read()
+                text = f.read()
+            self._memory_cache = (mtime, text)
+            return text
         except:
             return "(no memory file found)"
 
-    def _update_memory(self, new_entry):
-        """Append a new entry to memory under Past Decisions"""
+    def _update_memory(self, entries):
+        """Append entries to memory under Past Decisions — one read, one
+        in-memory splice, one write for the whole batch"""
+        if isinstance(entries, str):
+            entries = [entries]
+        if not entries:
+            return
         try:
             memory = self._read_memory()
-            timestamp = datetime.now(timezone(timedelta(hours=-5))).strftime("%-m/%-d %-I:%M%p")
+            timestamp = datetime.now(_ET).strftime("%-m/%-d %-I:%M%p")
+            block = "\n".join(f"- {timestamp}: {e}" for e in entries)
 
             # Find the Past Decisions section and append
             if "## Past Decisions" in memory:
                 memory = memory.replace(
                     "## Past Decisions",
-                    f"## Past Decisions\n- {timestamp}: {new_entry}",
+                    f"## Past Decisions\n{block}",
                     1
                 )
             else:
-                memory += f"\n## Past Decisions\n- {timestamp}: {new_entry}\n"
+                memory += f"\n## Past Decisions\n{block}\n"
 
             with open(self.memory_path, "w") as f:
                 f.write(memory)
+            self._memory_cache = (os.path.getmtime(self.memory_path), memory)
 
-            self.logger.info(f"Memory updated: {new_entry[:80]}...")
+            self.logger.info(f"Memory updated: {len(entries)} entr{'y' if len(entries) == 1 else 'ies'}")
 
         except Exception as e:
             self.logger.error(f"Memory update failed: {e}")
 
-    def _get_recent_trades(self, db_path, limit=50):
+    def _gather_bot_data(self, db_path, limit=50, window=50):
+        """Fetch trades, rolling stats, and loss streak over one pooled
+        connection instead of three separate connect/query/close round trips."""
+        try:
+            conn = _get_conn(db_path)
+        except Exception as e:
+            self.logger.error(f"DB open error: {e}")
+            return {"recent_trades": [], "stats": None, "loss_streak": 0}
+        recent = self._get_recent_trades(db_path, limit=limit, conn=conn)
+        return {
+            "recent_trades": recent,
+            "stats": self._get_rolling_stats(db_path, window=window, conn=conn),
+            # The streak is in the rows we just fetched — no third query
+            "loss_streak": self._detect_loss_streak(db_path, conn=conn, trades=recent),
+        }
+
+    def _get_recent_trades(self, db_path, limit=50, conn=None):
         """Pull recent trades from a bot's database"""
         try:
-            conn = sqlite3.connect(db_path)
+            if conn is None:
+                conn = _get_conn(db_path)
             c = conn.cursor()
 
-            c.execute("""
-                SELECT id, timestamp, asset, side, entry_price, binance_movement,
-                       stake, settled, won, pnl
-                FROM trades
-                ORDER BY id DESC
-                LIMIT ?
-            """, (limit,))
-
-            trades = []
-            for row in c.fetchall():
-                trades.append({
-                    "id": row[0],
-                    "time": row[1],
-                    "asset": row[2],
-                    "side": row[3],
-                    "entry": row[4],
-                    "movement": row[5],
-                    "stake": row[6],
-                    "settled": row[7],
-                    "won": row[8],
-                    "pnl": row[9]
-                })
-
-            conn.close()
-            return trades
+            c.execute(_RECENT_TRADES_SQL, (limit,))
+
+            # Column aliases in the SQL give the dict keys directly;
+            # sqlite3.Row builds the mapping in C instead of a 10-key
+            # literal dict per row
+            return [dict(row) for row in c.fetchall()]
 
         except Exception as e:
             self.logger.error(f"Trade fetch error: {e}")
             return []
 
-    def _get_rolling_stats(self, db_path, window=50):
+    def _get_rolling_stats(self, db_path, window=50, conn=None):
         """Calculate rolling stats for a bot"""
         try:
-            conn = sqlite3.connect(db_path)
+            if conn is None:
+                conn = _get_conn(db_path)
             c = conn.cursor()
 
-            c.execute("""
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN won = 1 THEN 1 ELSE 0 END) as wins,
-                       SUM(pnl) as total_pnl,
-                       AVG(entry_price) as avg_entry,
-                       AVG(ABS(binance_movement)) as avg_movement
-                FROM (
-                    SELECT * FROM trades
-                    WHERE settled = 1
-                    ORDER BY id DESC
-                    LIMIT ?
-                )
-            """, (window,))
+            c.execute(_ROLLING_STATS_SQL, (window,))
 
             row = c.fetchone()
-            conn.close()
 
             if not row or not row[0]:
                 return None
@@ -192,28 +301,43 @@ class Analyst:
             self.logger.error(f"Stats error: {e}")
             return None
 
-    def _detect_loss_streak(self, db_path):
-        """Detect consecutive losses"""
+    def _detect_loss_streak(self, db_path, conn=None, trades=None):
+        """Detect consecutive losses. Counts from a caller-supplied
+        newest-first trades list when given, skipping the query entirely."""
         try:
-            conn = sqlite3.connect(db_path)
+            if trades is not None:
+                streak = 0
+                settled_seen = 0
+                for t in trades:
+                    if not t["settled"]:
+                        continue
+                    settled_seen += 1
+                    if t["won"] == 0:
+                        streak += 1
+                    else:
+                        break
+                    if settled_seen >= 10:
+                        break
+                return streak
+
+            if conn is None:
+                conn = _get_conn(db_path)
             c = conn.cursor()
 
-            c.execute("""
-                SELECT won FROM trades
-                WHERE settled = 1
-                ORDER BY id DESC
-                LIMIT 10
-            """)
-
-            results = [row[0] for row in c.fetchall()]
-            conn.close()
-
-            streak = 0
-            for won in results:
-                if won == 0:
-                    streak += 1
-                else:
-                    break
+            try:
+                # Leading rows whose running SUM(won) is still zero = the
+                # streak; one int crosses the C boundary instead of 10 rows
+                c.execute(_LOSS_STREAK_SQL)
+                streak = c.fetchone()[0]
+            except sqlite3.OperationalError:
+                # sqlite < 3.25 has no window functions — count in Python
+                c.execute(_LOSS_STREAK_FALLBACK_SQL)
+                streak = 0
+                for (won,) in c.fetchall():
+                    if won == 0:
+                        streak += 1
+                    else:
+                        break
 
             return streak
 
@@ -224,22 +348,21 @@ class Analyst:
         """Run full scheduled analysis across all bots"""
         memory = self._read_memory()
 
-        # Gather data from all bots
+        # Gather data from all bots in parallel — the per-bot reads hit
+        # separate DB files and sqlite releases the GIL inside the C query,
+        # so wall clock drops to the slowest bot rather than the sum
+        enabled = [(name, cfg["db_path"])
+                   for name, cfg in bots_config.items() if cfg.get("enabled")]
         bot_data = {}
-        for bot_name, bot_config in bots_config.items():
-            if not bot_config.get("enabled"):
-                continue
-
-            db_path = bot_config["db_path"]
-            trades = self._get_recent_trades(db_path, limit=50)
-            stats = self._get_rolling_stats(db_path, window=50)
-            loss_streak = self._detect_loss_streak(db_path)
-
-            bot_data[bot_name] = {
-                "recent_trades": trades[:20],  # Send last 20 to save tokens
-                "stats": stats,
-                "loss_streak": loss_streak
-            }
+        if enabled:
+            with ThreadPoolExecutor(max_workers=min(8, len(enabled))) as pool:
+                gathered = pool.map(self._gather_bot_data, [p for _, p in enabled])
+                for (bot_name, _), data in zip(enabled, gathered):
+                    bot_data[bot_name] = {
+                        "recent_trades": data["recent_trades"][:20],  # Send last 20 to save tokens
+                        "stats": data["stats"],
+                        "loss_streak": data["loss_streak"]
+                    }
 
         system_prompt = """You are Jarvis, an AI trading bot manager. You monitor Polymarket trading bots and provide actionable analysis.
 
@@ -277,10 +400,10 @@ RESPONSE FORMAT (JSON):
 {memory}
 
 ## BOT DATA
-{json.dumps(bot_data, indent=2, default=str)}
+{jsonio.dumps(bot_data, indent=True)}
 
 ## TIMESTAMP
-{datetime.now(timezone(timedelta(hours=-5))).isoformat()}
+{datetime.now(_ET).isoformat()}
 
 Analyze the current state of all bots. What patterns do you see? Any recommendations?"""
 
@@ -291,28 +414,22 @@ Analyze the current state of all bots. What patterns do you see? Any recommendat
 
         # Parse JSON response
         try:
-            # Strip markdown code fences if present
             clean = response.strip()
-            
-            # Find JSON object in the response (Haiku sometimes adds text around it)
-            json_start = clean.find('{')
-            json_end = clean.rfind('}')
-            
-            if json_start >= 0 and json_end > json_start:
-                json_str = clean[json_start:json_end + 1]
-                analysis = json.loads(json_str)
+
+            m = _JSON_OBJ_RE.search(clean)
+            if m:
+                analysis = jsonio.loads(m.group(0))
             else:
                 # No JSON found, treat entire response as summary
                 analysis = {"summary": clean[:500], "observations": [], "recommendations": [], "memory_updates": [], "risk_alerts": []}
 
-            # Update memory with new learnings
-            for update in analysis.get("memory_updates", []):
-                self._update_memory(update)
+            # Update memory with new learnings (single read/write for the batch)
+            self._update_memory(analysis.get("memory_updates", []))
 
             self.logger.info(f"Analysis complete: {analysis.get('summary', 'No summary')[:100]}")
             return analysis
 
-        except json.JSONDecodeError:
+        except ValueError:
             self.logger.warning(f"Could not parse Haiku JSON response, storing raw")
             return {"summary": response, "observations": [], "recommendations": [], "raw": True}
 
@@ -335,8 +452,8 @@ RESPONSE FORMAT (JSON):
 
         user_prompt = f"""TRIGGER: {trigger_reason}
 BOT: {bot_name}
-STATS: {json.dumps(stats, default=str)}
-RECENT TRADES: {json.dumps(trades[:15], default=str)}
+STATS: {jsonio.dumps(stats)}
+RECENT TRADES: {jsonio.dumps(trades[:15])}
 MEMORY: {memory[:1000]}"""
 
         response = self._call_haiku(system_prompt, user_prompt)
@@ -345,10 +462,10 @@ MEMORY: {memory[:1000]}"""
             return None
 
         try:
-            clean = response.strip().strip("`").strip()
-            if clean.startswith("json"):
-                clean = clean[4:].strip()
-            return json.loads(clean)
+            m = _FENCED_JSON_RE.match(response)
+            if m:
+                return jsonio.loads(m.group(1))
+            return {"diagnosis": response, "severity": "unknown", "raw": True}
         except:
             return {"diagnosis": response, "severity": "unknown", "raw": True}
 
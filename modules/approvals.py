@@ -4,10 +4,19 @@ Manages pending actions with tiered permissions.
 Auto-approves safe actions, queues risky ones for user approval.
 """
 
-import json
 import os
 import time
-from datetime import datetime, timezone, timedelta
+import types
+from collections import OrderedDict, deque
+from datetime import datetime
+from itertools import count
+from zoneinfo import ZoneInfo
+
+from modules import jsonio
+
+# Built once — per-call timezone(timedelta(...)) construction adds up on the
+# submit/approve path, and ZoneInfo tracks DST unlike the old fixed -5 offset
+_ET = ZoneInfo("America/New_York")
 
 
 class ApprovalSystem:
@@ -15,69 +24,104 @@ class ApprovalSystem:
         self.config = config
         self.logger = logger
         self.permissions = config["permissions"]
+        # Flatten the three permission lists into one read-only action->tier
+        # map so submit_action does a single O(1) lookup instead of up to
+        # three list scans
+        # (built lowest-precedence first so auto_approve wins any overlap,
+        # matching the old if/elif check order)
+        tiers = {}
+        for action_type in self.permissions.get("never_touch", []):
+            tiers[action_type] = "forbidden"
+        for action_type in self.permissions.get("require_approval", []):
+            tiers[action_type] = "approval"
+        for action_type in self.permissions.get("auto_approve", []):
+            tiers[action_type] = "auto"
+        self._tier_by_action = types.MappingProxyType(tiers)
         self.queue_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "memory", "approval_queue.json"
         )
         self.history_path = os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-            "memory", "action_history.json"
+            "memory", "action_history.jsonl"
         )
+        # Pre-JSONL history file, read once for migration
+        self.legacy_history_path = self.history_path[:-1]
         self.queue = self._load_queue()
         self.history = self._load_history()
+        # Monotonic id suffix — two submissions in the same millisecond
+        # would otherwise collide on the dict key and silently drop one
+        self._action_seq = count(1)
 
     def _load_queue(self):
+        # Queue is indexed by action id for O(1) approve/reject;
+        # OrderedDict keeps submission order for the dashboard
         try:
             if os.path.exists(self.queue_path):
                 with open(self.queue_path, "r") as f:
-                    return json.load(f)
+                    return OrderedDict((a["id"], a) for a in jsonio.loads(f.read()))
         except:
             pass
-        return []
+        return OrderedDict()
 
     def _save_queue(self):
         try:
-            with open(self.queue_path, "w") as f:
-                json.dump(self.queue, f, indent=2, default=str)
+            jsonio.atomic_write(self.queue_path, list(self.queue.values()))
         except Exception as e:
             self.logger.error(f"Failed to save queue: {e}")
 
     def _load_history(self):
+        # History is append-only JSONL (one action per line) so resolving an
+        # action writes one line instead of re-serializing the whole file.
+        # Only the last 200 entries are kept in memory.
+        history = deque(maxlen=200)
+        lines = 0
         try:
             if os.path.exists(self.history_path):
                 with open(self.history_path, "r") as f:
-                    return json.load(f)
+                    for line in f:
+                        if line.strip():
+                            lines += 1
+                            history.append(jsonio.loads(line))
+            elif os.path.exists(self.legacy_history_path):
+                with open(self.legacy_history_path, "r") as f:
+                    for action in jsonio.loads(f.read())[-200:]:
+                        history.append(action)
         except:
             pass
-        return []
 
-    def _save_history(self):
+        # Compact on startup once the file holds far more than we keep
+        if lines > 2000:
+            try:
+                tmp = self.history_path + ".tmp"
+                with open(tmp, "w") as f:
+                    for action in history:
+                        f.write(jsonio.dumps(action) + "\n")
+                os.replace(tmp, self.history_path)
+            except Exception as e:
+                self.logger.error(f"Failed to compact history: {e}")
+
+        return history
+
+    def _append_history(self, action):
         try:
-            # Keep last 200 actions
-            self.history = self.history[-200:]
-            with open(self.history_path, "w") as f:
-                json.dump(self.history, f, indent=2, default=str)
+            with open(self.history_path, "a") as f:
+                f.write(jsonio.dumps(action) + "\n")
         except Exception as e:
             self.logger.error(f"Failed to save history: {e}")
 
     def get_permission_tier(self, action_type):
         """Determine which permission tier an action falls into"""
-        if action_type in self.permissions["auto_approve"]:
-            return "auto"
-        elif action_type in self.permissions["require_approval"]:
-            return "approval"
-        elif action_type in self.permissions["never_touch"]:
-            return "forbidden"
-        else:
-            return "approval"  # Default to requiring approval for unknown actions
+        # Default to requiring approval for unknown actions
+        return self._tier_by_action.get(action_type, "approval")
 
     def submit_action(self, action_type, description, reason, bot_name=None, params=None):
         """Submit an action for approval or auto-execution"""
         tier = self.get_permission_tier(action_type)
-        now = datetime.now(timezone(timedelta(hours=-5))).isoformat()
+        now = datetime.now(_ET).isoformat()
 
         action = {
-            "id": f"action_{int(time.time() * 1000)}",
+            "id": f"action_{int(time.time() * 1000)}_{next(self._action_seq)}",
             "type": action_type,
             "description": description,
             "reason": reason,
@@ -95,7 +139,7 @@ class ApprovalSystem:
             action["resolved_at"] = now
             action["resolved_by"] = "system"
             self.history.append(action)
-            self._save_history()
+            self._append_history(action)
             self.logger.warning(f"BLOCKED forbidden action: {action_type}")
             return {"status": "blocked", "action": action}
 
@@ -104,67 +148,66 @@ class ApprovalSystem:
             action["resolved_at"] = now
             action["resolved_by"] = "jarvis"
             self.history.append(action)
-            self._save_history()
+            self._append_history(action)
             self.logger.info(f"Auto-approved: {description}")
             return {"status": "auto_approved", "action": action}
 
         else:
             # Requires user approval
             # Check for duplicate pending actions with same description
-            for existing in self.queue:
-                if (existing["type"] == action_type and 
+            for existing in self.queue.values():
+                if (existing["type"] == action_type and
                     existing["status"] == "pending" and
                     existing["description"] == description):
                     self.logger.info(f"Duplicate approval already pending: {description}")
                     return {"status": "duplicate", "action": existing}
-            
-            self.queue.append(action)
+
+            self.queue[action["id"]] = action
             self._save_queue()
             self.logger.info(f"Queued for approval: {description}")
             return {"status": "pending", "action": action}
 
     def approve_action(self, action_id):
         """User approves a pending action"""
-        for i, action in enumerate(self.queue):
-            if action["id"] == action_id:
-                action["status"] = "approved"
-                action["resolved_at"] = datetime.now(timezone(timedelta(hours=-5))).isoformat()
-                action["resolved_by"] = "user"
-                self.history.append(action)
-                self.queue.pop(i)
-                self._save_queue()
-                self._save_history()
-                self.logger.info(f"User approved: {action['description']}")
-                return action
-        return None
+        action = self.queue.pop(action_id, None)
+        if action is None:
+            return None
+        action["status"] = "approved"
+        action["resolved_at"] = datetime.now(_ET).isoformat()
+        action["resolved_by"] = "user"
+        self.history.append(action)
+        self._save_queue()
+        self._append_history(action)
+        self.logger.info(f"User approved: {action['description']}")
+        return action
 
     def reject_action(self, action_id):
         """User rejects a pending action"""
-        for i, action in enumerate(self.queue):
-            if action["id"] == action_id:
-                action["status"] = "rejected"
-                action["resolved_at"] = datetime.now(timezone(timedelta(hours=-5))).isoformat()
-                action["resolved_by"] = "user"
-                self.history.append(action)
-                self.queue.pop(i)
-                self._save_queue()
-                self._save_history()
-                self.logger.info(f"User rejected: {action['description']}")
-                return action
-        return None
+        action = self.queue.pop(action_id, None)
+        if action is None:
+            return None
+        action["status"] = "rejected"
+        action["resolved_at"] = datetime.now(_ET).isoformat()
+        action["resolved_by"] = "user"
+        self.history.append(action)
+        self._save_queue()
+        self._append_history(action)
+        self.logger.info(f"User rejected: {action['description']}")
+        return action
 
     def get_pending_actions(self):
         """Get all pending actions"""
-        return [a for a in self.queue if a["status"] == "pending"]
+        return [a for a in self.queue.values() if a["status"] == "pending"]
 
     def get_recent_history(self, limit=30):
         """Get recent action history"""
-        return self.history[-limit:]
+        return list(self.history)[-limit:]
 
     def get_dashboard_data(self):
         """Get data for dashboard display"""
+        pending = self.get_pending_actions()
         return {
-            "pending": self.get_pending_actions(),
+            "pending": pending,
             "recent_history": self.get_recent_history(20),
-            "pending_count": len(self.get_pending_actions())
+            "pending_count": len(pending)
         }
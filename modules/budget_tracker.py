@@ -3,10 +3,12 @@ Jarvis Budget Tracker
 Tracks API usage, enforces spending limits, provides dashboard data.
 """
 
-import json
 import os
+from collections import deque
 from datetime import datetime, timezone, timedelta
 
+from modules import jsonio
+
 
 class BudgetTracker:
     def __init__(self, config, logger):
@@ -17,28 +19,96 @@ class BudgetTracker:
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
             "memory", "api_usage.json"
         )
+        # Per-call records go to append-only JSONL; api_usage.json keeps only
+        # the small daily/monthly aggregates. The old scheme re-serialized
+        # every call ever made on each log_call — O(N^2) over a day.
+        self.calls_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "memory", "api_usage.jsonl"
+        )
         self.usage = self._load_usage()
+        self._recent_calls = self._load_recent_calls()
+
+        # Hot counters: the current day/month total dicts, shared by
+        # reference with self.usage so increments persist through
+        # _save_usage without re-deriving string keys on every check
+        self._today_date = None
+        self._month = None
+        self._today = None
+        self._this_month = None
+        self._roll(datetime.now(timezone.utc))
+
+    def _roll(self, now):
+        """Rebind the hot counters on day/month rollover"""
+        day = now.date()
+        if day != self._today_date:
+            self._today_date = day
+            self._today = self.usage["daily_totals"].setdefault(
+                day.isoformat(), {"calls": 0, "cost": 0, "tokens": 0})
+            month = (day.year, day.month)
+            if month != self._month:
+                self._month = month
+                self._this_month = self.usage["monthly_totals"].setdefault(
+                    day.strftime("%Y-%m"), {"calls": 0, "cost": 0, "tokens": 0})
 
     def _load_usage(self):
-        """Load usage data from disk"""
+        """Load usage aggregates from disk"""
         try:
             if os.path.exists(self.log_path):
                 with open(self.log_path, "r") as f:
-                    return json.load(f)
+                    data = jsonio.loads(f.read())
+
+                # One-time migration: move the legacy in-file call list out
+                # to the JSONL log
+                legacy_calls = data.pop("calls", None)
+                if legacy_calls:
+                    try:
+                        with open(self.calls_path, "a") as f:
+                            for record in legacy_calls:
+                                f.write(jsonio.dumps(record) + "\n")
+                    except Exception as e:
+                        self.logger.error(f"Call-log migration failed: {e}")
+
+                data.setdefault("daily_totals", {})
+                data.setdefault("monthly_totals", {})
+                return data
         except:
             pass
 
         return {
-            "calls": [],
             "daily_totals": {},
             "monthly_totals": {}
         }
 
+    def _load_recent_calls(self):
+        """Tail of the JSONL call log, for the dashboard. Compacts the log
+        on startup once it holds far more than anything reads back."""
+        lines = 0
+        tail = deque(maxlen=1000)
+        try:
+            with open(self.calls_path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        lines += 1
+                        tail.append(line)
+        except:
+            return deque(maxlen=10)
+
+        if lines > 10000:
+            try:
+                tmp = self.calls_path + ".tmp"
+                with open(tmp, "w") as f:
+                    f.writelines(tail)
+                os.replace(tmp, self.calls_path)
+            except Exception as e:
+                self.logger.error(f"Failed to compact call log: {e}")
+
+        return deque((jsonio.loads(l) for l in tail), maxlen=10)
+
     def _save_usage(self):
         """Save usage data to disk"""
         try:
-            with open(self.log_path, "w") as f:
-                json.dump(self.usage, f, indent=2, default=str)
+            jsonio.atomic_write(self.log_path, self.usage)
         except Exception as e:
             self.logger.error(f"Failed to save usage: {e}")
 
@@ -60,25 +130,34 @@ class BudgetTracker:
             "cost": cost
         }
 
-        self.usage["calls"].append(call_record)
-
-        # Update daily total
-        day_key = now.strftime("%Y-%m-%d")
-        if day_key not in self.usage["daily_totals"]:
-            self.usage["daily_totals"][day_key] = {"calls": 0, "cost": 0, "tokens": 0}
-
-        self.usage["daily_totals"][day_key]["calls"] += 1
-        self.usage["daily_totals"][day_key]["cost"] += cost
-        self.usage["daily_totals"][day_key]["tokens"] += input_tokens + output_tokens
-
-        # Update monthly total
-        month_key = now.strftime("%Y-%m")
-        if month_key not in self.usage["monthly_totals"]:
-            self.usage["monthly_totals"][month_key] = {"calls": 0, "cost": 0, "tokens": 0}
-
-        self.usage["monthly_totals"][month_key]["calls"] += 1
-        self.usage["monthly_totals"][month_key]["cost"] += cost
-        self.usage["monthly_totals"][month_key]["tokens"] += input_tokens + output_tokens
+        self._recent_calls.append(call_record)
+        try:
+            with open(self.calls_path, "a") as f:
+                f.write(jsonio.dumps(call_record) + "\n")
+        except Exception as e:
+            self.logger.error(f"Failed to append call log: {e}")
+
+        self._roll(now)
+        self._today["calls"] += 1
+        self._today["cost"] += cost
+        self._today["tokens"] += input_tokens + output_tokens
+
+        self._this_month["calls"] += 1
+        self._this_month["cost"] += cost
+        self._this_month["tokens"] += input_tokens + output_tokens
+
+        # Keep the aggregate dicts to a rolling window so _save_usage stays
+        # O(window) instead of O(lifetime); the keys sort lexicographically
+        day_cutoff = (now - timedelta(days=90)).strftime("%Y-%m-%d")
+        if any(k < day_cutoff for k in self.usage["daily_totals"]):
+            self.usage["daily_totals"] = {
+                k: v for k, v in self.usage["daily_totals"].items() if k >= day_cutoff
+            }
+        month_cutoff = (now - timedelta(days=730)).strftime("%Y-%m")
+        if any(k < month_cutoff for k in self.usage["monthly_totals"]):
+            self.usage["monthly_totals"] = {
+                k: v for k, v in self.usage["monthly_totals"].items() if k >= month_cutoff
+            }
 
         self._save_usage()
 
@@ -86,34 +165,27 @@ class BudgetTracker:
 
     def can_make_call(self):
         """Check if we're within budget limits"""
-        now = datetime.now(timezone.utc)
-        day_key = now.strftime("%Y-%m-%d")
-        month_key = now.strftime("%Y-%m")
+        self._roll(datetime.now(timezone.utc))
 
         # Check daily call limit
-        daily = self.usage["daily_totals"].get(day_key, {"calls": 0, "cost": 0})
-        if daily["calls"] >= self.budget_config["max_calls_per_day"]:
+        if self._today["calls"] >= self.budget_config["max_calls_per_day"]:
             return False
 
         # Check daily cost limit
-        if daily["cost"] >= self.budget_config["daily_limit"]:
+        if self._today["cost"] >= self.budget_config["daily_limit"]:
             return False
 
         # Check monthly cost limit
-        monthly = self.usage["monthly_totals"].get(month_key, {"cost": 0})
-        if monthly["cost"] >= self.budget_config["monthly_limit"]:
+        if self._this_month["cost"] >= self.budget_config["monthly_limit"]:
             return False
 
         return True
 
     def get_dashboard_data(self):
         """Get data for the dashboard budget display"""
-        now = datetime.now(timezone.utc)
-        day_key = now.strftime("%Y-%m-%d")
-        month_key = now.strftime("%Y-%m")
-
-        daily = self.usage["daily_totals"].get(day_key, {"calls": 0, "cost": 0, "tokens": 0})
-        monthly = self.usage["monthly_totals"].get(month_key, {"calls": 0, "cost": 0, "tokens": 0})
+        self._roll(datetime.now(timezone.utc))
+        daily = self._today
+        monthly = self._this_month
 
         daily_limit = self.budget_config["daily_limit"]
         monthly_limit = self.budget_config["monthly_limit"]
@@ -136,5 +208,5 @@ class BudgetTracker:
                 "tokens": monthly["tokens"]
             },
             "can_call": self.can_make_call(),
-            "recent_calls": self.usage["calls"][-10:]  # Last 10 calls
+            "recent_calls": list(self._recent_calls)  # Last 10 calls
         }
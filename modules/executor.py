@@ -3,10 +3,128 @@ Jarvis Action Executor
 Applies approved actions to bot configurations and code.
 """
 
+import importlib.util
+import io
+import mmap
+import os
 import subprocess
+import sys
 import re
-import sqlite3
-from datetime import datetime, timezone, timedelta
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from modules import jsonio
+
+# Built once — same DST-aware Eastern zone the rest of the daemon stamps with
+_ET = ZoneInfo("America/New_York")
+
+
+@contextmanager
+def _chdir(directory):
+    """Run a block from another working directory, restoring on exit"""
+    prev = os.getcwd()
+    os.chdir(directory)
+    try:
+        yield
+    finally:
+        os.chdir(prev)
+
+# Resolved once per dispatch so handlers stop re-chasing
+# config["bots"][name] and rebuilding path strings
+BotCtx = namedtuple("BotCtx", "name directory main_file repo_path config")
+
+# Compiled once — these scan bot source on every settings edit. The
+# single-line numeric patterns are bytes so they can search an mmap
+# directly for in-place patching.
+_RE_MIN_MOVE = re.compile(rb"self\.min_price_movement\s*=\s*[\d.]+")
+_RE_STAKE = re.compile(rb"self\.stake_size\s*=\s*[\d.]+")
+_RE_WINDOW = re.compile(rb"window_end\s*-\s*\d+")
+# min and max conviction share one alternation so both edits happen in a
+# single scan of the file
+_RE_CONV = re.compile(rb"self\.(?P<which>min|max)_poly_conviction\s*=\s*[\d.]+")
+
+# RSI toggle anchors as (commented, uncommented) pairs; each direction is
+# one alternation pass over the file instead of a chain of str.replace
+# sweeps (same table-driven idiom as integrate_futures' patch list)
+_RSI_PAIRS = [
+    ("#                        # Block weak RSI signals",
+     "                        # Block weak RSI signals"),
+    ("#                        if rsi_result['signal'] == 'weak':",
+     "                        if rsi_result['signal'] == 'weak':"),
+    ("#                            print(f\"    ⏭️  SKIP - Weak RSI signal (avoiding bad entry)\")",
+     "                            print(f\"    ⏭️  SKIP - Weak RSI signal (avoiding bad entry)\")"),
+    ("#                            sys.stdout.flush()",
+     "                            sys.stdout.flush()"),
+    ("#                            continue",
+     "                            continue"),
+]
+# Compiled over bytes — the whole edit pipeline stays in bytes so the
+# source is never UTF-8 decoded and re-encoded just to flip comments
+_RSI_ENABLE_MAP = {old.encode(): new.encode() for old, new in _RSI_PAIRS}
+_RSI_ENABLE_RE = re.compile(b"|".join(re.escape(k) for k in _RSI_ENABLE_MAP))
+# Disabling only re-comments the guard lines, as before
+_RSI_DISABLE_MAP = {new.encode(): old.encode() for old, new in _RSI_PAIRS[:2]}
+_RSI_DISABLE_RE = re.compile(b"|".join(re.escape(k) for k in _RSI_DISABLE_MAP))
+
+
+def _read_source(path):
+    """Read a bot source file through mmap as bytes — the kernel pages the
+    file straight out of the page cache, and skipping the decode keeps the
+    whole regex pipeline byte-mode"""
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.read()
+        except ValueError:
+            # Zero-length files can't be mapped
+            return f.read()
+
+
+def _atomic_write(path, data):
+    """Full-file rewrite via temp + fdatasync + rename, so a crash
+    mid-write can never leave the bot's source truncated"""
+    if isinstance(data, str):
+        data = data.encode()
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+        os.fdatasync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+
+def _patch_setting(path, pattern, new_line):
+    """Replace the single source line matching a bytes pattern. When the
+    replacement fits in the matched span the bytes are patched in place —
+    a ~30-byte write instead of rewriting the whole file — with space
+    padding to keep offsets stable. Falls back to a full rewrite when the
+    new value is longer. Returns True if a match was patched."""
+    repl = new_line.encode()
+    with open(path, "r+b") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0)
+        except ValueError:
+            return False
+        try:
+            m = pattern.search(mm)
+            if not m:
+                return False
+            start, end = m.span()
+            if len(repl) <= end - start:
+                mm[start:end] = repl.ljust(end - start)
+                mm.flush()
+                return True
+            content = mm[:start] + repl + mm[end:]
+        finally:
+            mm.close()
+
+    _atomic_write(path, content)
+    return True
 
 
 class ActionExecutor:
@@ -14,14 +132,23 @@ class ActionExecutor:
         self.config = config
         self.logger = logger
         self.git = git_manager
-
-    def execute_action(self, action):
-        """Route an action to the correct handler"""
-        action_type = action["type"]
-        bot_name = action.get("bot")
-        params = action.get("params", {})
-
-        handlers = {
+        self._bots = config["bots"]
+        # Commits queued by handlers and flushed once per batch, so N
+        # actions in one tick cost one sync per bot and one git commit.
+        # The lock covers queueing and the flush swap — dashboard approval
+        # threads and the main loop both reach these
+        self._pending_syncs = {}
+        self._pending_commits = []
+        self._commit_lock = threading.Lock()
+        # Kill switches are transient signals, so they live on a tmpfs —
+        # pause/resume never touches the disk
+        self.kill_dir = config.get("kill_dir", "/dev/shm/jarvis")
+        os.makedirs(self.kill_dir, exist_ok=True)
+        # redeem_winnings modules imported at most once per bot directory
+        # (False marks scripts without a main() entry point)
+        self._redeem_cache = {}
+        # Dispatch table built once; execute_action is a single dict get
+        self._handlers = {
             "restart_crashed_bot": self._restart_bot,
             "redeem_settlements": self._force_redeem,
             "pause_on_loss_streak": self._pause_bot,
@@ -34,251 +161,364 @@ class ActionExecutor:
             "log_observation": self._log_observation,
         }
 
-        handler = handlers.get(action_type)
+    def _queue_commit(self, bot_name, bot_config, paths, summary, reason):
+        with self._commit_lock:
+            self._pending_syncs[bot_name] = bot_config
+            self._pending_commits.append((paths, summary, reason))
+
+    def flush(self):
+        """Sync and commit everything queued since the last flush"""
+        # Swap the queues out under the lock, then do the slow git work
+        # outside it — anything queued mid-flush lands in the fresh lists
+        # and gets picked up by the next flush instead of being dropped
+        with self._commit_lock:
+            if not self._pending_commits:
+                return
+            pending_syncs = self._pending_syncs
+            pending_commits = self._pending_commits
+            self._pending_syncs = {}
+            self._pending_commits = []
+
+        for bot_name, bot_config in pending_syncs.items():
+            self.git.sync_bot_files(bot_name, bot_config)
+
+        paths = []
+        for commit_paths, _, _ in pending_commits:
+            for path in commit_paths:
+                if path not in paths:
+                    paths.append(path)
+        message = "; ".join(s for _, s, _ in pending_commits)
+        reason = "; ".join(r for _, _, r in pending_commits if r)
+        self.git.commit_change(paths, message, reason)
+
+    def _bot_ctx(self, bot_name):
+        """Resolve a bot's config and paths once"""
+        bot_config = self._bots.get(bot_name, {})
+        directory = bot_config.get("directory", "")
+        rel = bot_config.get("main_file", "")
+        return BotCtx(bot_name, directory, f"{directory}/{rel}",
+                      f"{bot_name}/{rel}", bot_config)
+
+    def execute_action(self, action):
+        """Route an action to the correct handler"""
+        action_type = action["type"]
+        bot = self._bot_ctx(action.get("bot"))
+        params = action.get("params", {})
+
+        handler = self._handlers.get(action_type)
         if handler:
             try:
-                result = handler(bot_name, params)
-                self.logger.info(f"Executed {action_type}: {result}")
+                result = handler(bot, params)
+                # %-style args defer formatting result until (unless) the
+                # record is actually emitted
+                self.logger.info("Executed %s: %s", action_type, result)
                 return {"success": True, "result": result}
             except Exception as e:
-                self.logger.error(f"Execute failed {action_type}: {e}")
+                self.logger.error("Execute failed %s: %s", action_type, e)
                 return {"success": False, "error": str(e)}
         else:
-            self.logger.warning(f"No handler for action: {action_type}")
+            self.logger.warning("No handler for action: %s", action_type)
             return {"success": False, "error": "no_handler"}
 
-    def _restart_bot(self, bot_name, params):
+    def execute_many(self, actions):
+        """Execute a batch of actions, then sync and commit once.
+
+        Several same-bot edits in one tick used to trigger a working-tree
+        sync each; handlers queue their commits, and flush() dedupes the
+        syncs by bot, so the whole batch costs one sync per touched bot
+        and a single commit."""
+        results = [self.execute_action(action) for action in actions]
+        self.flush()
+        return results
+
+    def _restart_bot(self, bot, params):
         """Restart a bot (delegated to watchdog)"""
-        return {"action": "restart", "bot": bot_name, "delegate": "watchdog"}
+        return {"action": "restart", "bot": bot.name, "delegate": "watchdog"}
+
+    def _load_redeem_module(self, directory):
+        """Import a bot's redeem_winnings.py once and reuse it. Returns
+        None for scripts without a main() entry point — importing those
+        would run the redemption as a top-level side effect."""
+        mod = self._redeem_cache.get(directory)
+        if mod is None:
+            path = os.path.join(directory, "redeem_winnings.py")
+            if b"def main" not in _read_source(path):
+                self._redeem_cache[directory] = False
+                return None
+            spec = importlib.util.spec_from_file_location(
+                f"_redeem_{len(self._redeem_cache)}", path)
+            mod = importlib.util.module_from_spec(spec)
+            # Module-level code (load_dotenv, relative DB paths) expects to
+            # run from the bot directory, same as the subprocess did
+            with _chdir(directory):
+                spec.loader.exec_module(mod)
+            self._redeem_cache[directory] = mod
+        return mod or None
+
+    def _force_redeem(self, bot, params):
+        """Force redemption of settled positions. Calls the script's
+        main() in-process when it has one — skipping a fork + interpreter
+        start per redemption — and falls back to a subprocess otherwise."""
+        try:
+            mod = self._load_redeem_module(bot.directory)
+        except Exception:
+            self._redeem_cache.pop(bot.directory, None)
+            mod = None
 
-    def _force_redeem(self, bot_name, params):
-        """Force redemption of settled positions"""
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
+        if mod is not None:
+            try:
+                buf = io.StringIO()
+                # Run from the bot directory — these scripts resolve .env
+                # and their DB relative to it, as the subprocess used to
+                with _chdir(bot.directory), redirect_stdout(buf):
+                    mod.main()
+                return {"stdout": buf.getvalue()[:500], "returncode": 0}
+            except Exception as e:
+                return {"error": str(e)}
 
         try:
-            result = subprocess.run(
-                ["python3", "redeem_winnings.py"],
-                capture_output=True, text=True, timeout=60,
-                cwd=directory
+            # sys.executable skips PATH resolution and guarantees the same
+            # interpreter; close_fds=False drops the pre-exec fd sweep.
+            # Pass the inherited environment as-is — scripts may read
+            # exported API keys rather than a local .env
+            proc = subprocess.Popen(
+                [sys.executable, "redeem_winnings.py"],
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, cwd=bot.directory, close_fds=False,
+                env=os.environ
             )
-            return {"stdout": result.stdout[:500], "returncode": result.returncode}
+            # Hard 60s deadline: the timer kills a hung script (closing its
+            # pipe and unblocking the read loop) so a wedged redeem can't
+            # freeze the main loop like an unbounded read would
+            killed = []
+
+            def _kill():
+                killed.append(True)
+                proc.kill()
+
+            timer = threading.Timer(60, _kill)
+            timer.start()
+            try:
+                # Stream the output into a bounded tail instead of buffering
+                # it all just to slice off 500 chars — a chatty script no
+                # longer costs megabytes of throwaway strings
+                tail = deque(maxlen=20)
+                for line in proc.stdout:
+                    tail.append(line.rstrip("\n"))
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+
+            if killed:
+                return {"error": "timed out after 60s (killed)",
+                        "stdout": "\n".join(tail)}
+            return {"stdout": "\n".join(tail), "returncode": returncode}
         except Exception as e:
             return {"error": str(e)}
 
-    def _pause_bot(self, bot_name, params):
+    def _pause_bot(self, bot, params):
         """Pause a bot by creating a kill switch file"""
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        kill_file = f"{directory}/KILL_SWITCH"
-
-        with open(kill_file, "w") as f:
-            reason = params.get("reason", "loss_streak")
-            f.write(f"Paused by Jarvis: {reason}\n")
-            f.write(f"Time: {datetime.now(timezone(timedelta(hours=-5))).isoformat()}\n")
+        kill_file = f"{self.kill_dir}/{bot.name}.KILL_SWITCH"
+
+        reason = params.get("reason", "loss_streak")
+        body = (f"Paused by Jarvis: {reason}\n"
+                f"Time: {datetime.now(_ET).isoformat()}\n").encode()
+        # Write both the tmpfs switch and the legacy on-disk one — bots
+        # still polling only the old path must see the pause too
+        for path in (kill_file, f"{bot.directory}/KILL_SWITCH"):
+            # Raw fd write — no buffered file object or codec for ~150 bytes
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, body)
+            finally:
+                os.close(fd)
 
         return {"paused": True, "kill_file": kill_file}
 
-    def _resume_bot(self, bot_name, params):
+    def _resume_bot(self, bot, params):
         """Resume a bot by removing kill switch"""
-        import os
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        kill_file = f"{directory}/KILL_SWITCH"
+        # Unlink both the tmpfs switch and the legacy on-disk one — bots
+        # check both paths while the migration is in flight
+        removed = False
+        for kill_file in (f"{self.kill_dir}/{bot.name}.KILL_SWITCH",
+                          f"{bot.directory}/KILL_SWITCH"):
+            # One unlink instead of stat + remove (and no TOCTOU window)
+            try:
+                os.unlink(kill_file)
+                removed = True
+            except FileNotFoundError:
+                pass
 
-        if os.path.exists(kill_file):
-            os.remove(kill_file)
+        if removed:
             return {"resumed": True}
         return {"resumed": True, "note": "kill_switch_not_found"}
 
-    def _change_movement_filter(self, bot_name, params):
+    def _update_settings(self, bot, updates):
+        """Merge tunables into the bot's settings.json when it has one.
+        Migrated bots read that file at boot, so the edit is a ~200-byte
+        JSON write with no source scanning. Returns False for bots still
+        carrying their tunables in code."""
+        path = os.path.join(bot.directory, "settings.json")
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                settings = jsonio.loads(f.read())
+        except ValueError:
+            settings = {}
+        settings.update(updates)
+        jsonio.atomic_write(path, settings)
+        return True
+
+    def _change_movement_filter(self, bot, params):
         """Change the minimum price movement filter"""
         new_value = params.get("value")
         if new_value is None:
             return {"error": "no_value_provided"}
 
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        main_file = f"{directory}/{bot_config.get('main_file', '')}"
-
-        # Read file
-        with open(main_file, "r") as f:
-            content = f.read()
-
-        # Find and replace movement filter
-        old_pattern = r"self\.min_price_movement\s*=\s*[\d.]+"
-        new_line = f"self.min_price_movement = {new_value}"
-
-        if re.search(old_pattern, content):
-            content = re.sub(old_pattern, new_line, content)
-            with open(main_file, "w") as f:
-                f.write(content)
 
-            # Git commit
-            self.git.sync_bot_files(bot_name, bot_config)
-            self.git.commit_change(
-                [f"{bot_name}/{bot_config.get('main_file', '')}"],
-                f"movement filter {new_value}%",
-                params.get("reason", "")
-            )
-
-            return {"changed": True, "new_value": new_value}
+        if self._update_settings(bot, {"min_price_movement": new_value}):
+            changed_path = f"{bot.name}/settings.json"
+        elif _patch_setting(bot.main_file, _RE_MIN_MOVE,
+                            f"self.min_price_movement = {new_value}"):
+            changed_path = bot.repo_path
         else:
             return {"error": "pattern_not_found"}
 
-    def _change_stake_size(self, bot_name, params):
+        self._queue_commit(
+            bot.name, bot.config,
+            [changed_path],
+            f"movement filter {new_value}%",
+            params.get("reason", "")
+        )
+
+        return {"changed": True, "new_value": new_value}
+
+    def _change_stake_size(self, bot, params):
         """Change stake size"""
         new_value = params.get("value")
         if new_value is None:
             return {"error": "no_value_provided"}
 
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        main_file = f"{directory}/{bot_config.get('main_file', '')}"
-
-        with open(main_file, "r") as f:
-            content = f.read()
-
-        old_pattern = r"self\.stake_size\s*=\s*[\d.]+"
-        new_line = f"self.stake_size = {new_value}"
-
-        if re.search(old_pattern, content):
-            content = re.sub(old_pattern, new_line, content)
-            with open(main_file, "w") as f:
-                f.write(content)
-
-            self.git.sync_bot_files(bot_name, bot_config)
-            self.git.commit_change(
-                [f"{bot_name}/{bot_config.get('main_file', '')}"],
-                f"stake size → ${new_value}",
-                params.get("reason", "")
-            )
 
-            return {"changed": True, "new_value": new_value}
+        if self._update_settings(bot, {"stake_size": new_value}):
+            changed_path = f"{bot.name}/settings.json"
+        elif _patch_setting(bot.main_file, _RE_STAKE,
+                            f"self.stake_size = {new_value}"):
+            changed_path = bot.repo_path
         else:
             return {"error": "pattern_not_found"}
 
-    def _change_entry_timing(self, bot_name, params):
+        self._queue_commit(
+            bot.name, bot.config,
+            [changed_path],
+            f"stake size → ${new_value}",
+            params.get("reason", "")
+        )
+
+        return {"changed": True, "new_value": new_value}
+
+    def _change_entry_timing(self, bot, params):
         """Change entry timing (seconds before close)"""
         new_seconds = params.get("value")
         if new_seconds is None:
             return {"error": "no_value_provided"}
 
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        main_file = f"{directory}/{bot_config.get('main_file', '')}"
-
-        with open(main_file, "r") as f:
-            content = f.read()
-
-        old_pattern = r"window_end\s*-\s*\d+"
-        new_line = f"window_end - {new_seconds}"
-
-        if re.search(old_pattern, content):
-            content = re.sub(old_pattern, new_line, content)
-            with open(main_file, "w") as f:
-                f.write(content)
-
-            self.git.sync_bot_files(bot_name, bot_config)
-            self.git.commit_change(
-                [f"{bot_name}/{bot_config.get('main_file', '')}"],
-                f"entry timing → {new_seconds}s before close",
-                params.get("reason", "")
-            )
 
-            return {"changed": True, "new_value": new_seconds}
+        if self._update_settings(bot, {"entry_timing_seconds": new_seconds}):
+            changed_path = f"{bot.name}/settings.json"
+        elif _patch_setting(bot.main_file, _RE_WINDOW,
+                            f"window_end - {new_seconds}"):
+            changed_path = bot.repo_path
         else:
             return {"error": "pattern_not_found"}
 
-    def _toggle_rsi(self, bot_name, params):
+        self._queue_commit(
+            bot.name, bot.config,
+            [changed_path],
+            f"entry timing → {new_seconds}s before close",
+            params.get("reason", "")
+        )
+
+        return {"changed": True, "new_value": new_seconds}
+
+    def _toggle_rsi(self, bot, params):
         """Enable or disable RSI filter"""
         enable = params.get("enable", False)
 
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        main_file = f"{directory}/{bot_config.get('main_file', '')}"
 
-        with open(main_file, "r") as f:
-            content = f.read()
+        content = _read_source(bot.main_file)
 
         if enable:
             # Uncomment the RSI block
-            content = content.replace(
-                "#                        # Block weak RSI signals",
-                "                        # Block weak RSI signals"
-            ).replace(
-                "#                        if rsi_result['signal'] == 'weak':",
-                "                        if rsi_result['signal'] == 'weak':"
-            ).replace(
-                "#                            print(f\"    ⏭️  SKIP - Weak RSI signal (avoiding bad entry)\")",
-                "                            print(f\"    ⏭️  SKIP - Weak RSI signal (avoiding bad entry)\")"
-            ).replace(
-                "#                            sys.stdout.flush()",
-                "                            sys.stdout.flush()"
-            ).replace(
-                "#                            continue",
-                "                            continue"
-            )
+            content = _RSI_ENABLE_RE.sub(
+                lambda m: _RSI_ENABLE_MAP[m.group(0)], content)
         else:
             # Comment out the RSI block
-            content = content.replace(
-                "                        # Block weak RSI signals",
-                "#                        # Block weak RSI signals"
-            ).replace(
-                "                        if rsi_result['signal'] == 'weak':",
-                "#                        if rsi_result['signal'] == 'weak':"
-            )
+            content = _RSI_DISABLE_RE.sub(
+                lambda m: _RSI_DISABLE_MAP[m.group(0)], content)
 
-        with open(main_file, "w") as f:
-            f.write(content)
+        _atomic_write(bot.main_file, content)
 
         state = "enabled" if enable else "disabled"
-        self.git.sync_bot_files(bot_name, bot_config)
-        self.git.commit_change(
-            [f"{bot_name}/{bot_config.get('main_file', '')}"],
+        self._queue_commit(
+            bot.name, bot.config,
+            [bot.repo_path],
             f"RSI filter {state}",
             params.get("reason", "")
         )
 
         return {"changed": True, "rsi_enabled": enable}
 
-    def _change_conviction(self, bot_name, params):
+    def _change_conviction(self, bot, params):
         """Change conviction range (min/max poly conviction)"""
         new_min = params.get("min")
         new_max = params.get("max")
 
-        bot_config = self.config["bots"].get(bot_name, {})
-        directory = bot_config.get("directory", "")
-        main_file = f"{directory}/{bot_config.get('main_file', '')}"
 
-        with open(main_file, "r") as f:
-            content = f.read()
+        values = {}
+        if new_min is not None:
+            values["min"] = new_min
+        if new_max is not None:
+            values["max"] = new_max
+
+        if values and self._update_settings(
+                bot, {f"{k}_poly_conviction": v for k, v in values.items()}):
+            self._queue_commit(
+                bot.name, bot.config,
+                [f"{bot.name}/settings.json"],
+                f"conviction range → {new_min or '?'}-{new_max or '?'}",
+                params.get("reason", "")
+            )
+            return {"changed": True, "min": new_min, "max": new_max}
+
+        content = _read_source(bot.main_file)
 
         changed = False
 
-        if new_min is not None:
-            pattern = r"self\.min_poly_conviction\s*=\s*[\d.]+"
-            content = re.sub(pattern, f"self.min_poly_conviction = {new_min}", content)
+        def _repl(m):
+            nonlocal changed
+            which = m.group("which").decode()
+            if which not in values:
+                return m.group(0)
             changed = True
+            return f"self.{which}_poly_conviction = {values[which]}".encode()
 
-        if new_max is not None:
-            pattern = r"self\.max_poly_conviction\s*=\s*[\d.]+"
-            content = re.sub(pattern, f"self.max_poly_conviction = {new_max}", content)
-            changed = True
+        if values:
+            content = _RE_CONV.sub(_repl, content)
 
         if changed:
-            with open(main_file, "w") as f:
-                f.write(content)
+            _atomic_write(bot.main_file, content)
 
-            self.git.sync_bot_files(bot_name, bot_config)
-            self.git.commit_change(
-                [f"{bot_name}/{bot_config.get('main_file', '')}"],
+            self._queue_commit(
+                bot.name, bot.config,
+                [bot.repo_path],
                 f"conviction range → {new_min or '?'}-{new_max or '?'}",
                 params.get("reason", "")
             )
 
         return {"changed": changed, "min": new_min, "max": new_max}
 
-    def _log_observation(self, bot_name, params):
+    def _log_observation(self, bot, params):
         """Just log an observation - no code changes"""
         return {"logged": True, "observation": params.get("message", "")}
@@ -10,17 +10,125 @@ Integrates with existing Jarvis architecture:
   - Weekly summary stats
 """
 
+import io
 import os
 import json
 import time
 import sqlite3
 import logging
+import threading
+from dataclasses import dataclass, asdict
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+# Hoisted out of the hot loaders/senders — the per-call `import` inside a
+# method still costs a sys.modules lookup every tick. Guarded because the
+# futures feature degrades gracefully when the data stack isn't installed;
+# yfinance stays lazy in the refresh methods (it is slow to import and
+# only needed twice a day).
+try:
+    import pandas as pd
+    import numpy as np
+except ImportError:
+    pd = np = None
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
 ET = ZoneInfo("America/New_York")
 
+# Strat candle labels indexed by (broke_high << 1) | broke_low
+_STRAT_LABELS = ("1", "2D", "2U", "3")
+_STRAT_CODES = {label: i for i, label in enumerate(_STRAT_LABELS)}
+
+
+@dataclass(slots=True)
+class Levels:
+    """Previous-day key levels. Slot attributes make the per-tick pd_eq
+    reads a C-level lookup instead of a dict hash; asdict() at the
+    dashboard boundary keeps the JSON payload shape unchanged."""
+    pdh: float
+    pdl: float
+    pd_eq: float
+    pd_range: float
+    premium: float
+    discount: float
+
+# The live monitor only looks at today's session (~18 candles); 64 KB of
+# tail covers well over a thousand 5m rows, so the CSV can grow without
+# the tick loop paying for its history
+_5M_TAIL_BYTES = 65536
+
+# SQL as module constants: sqlite3's per-connection statement cache keys
+# on the string object, so passing the same literal skips the parser
+_INSERT_STRAT_SQL = """
+    INSERT OR REPLACE INTO strat_log
+    (date, sequence, bias, bias_pct, pdh, pdl, pd_eq, pd_range)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_MARK_PREMARKET_SQL = """
+    INSERT OR REPLACE INTO session_log (date, premarket_sent)
+    VALUES (?, 1)
+"""
+
+_INSERT_EQ_SQL = """
+    INSERT INTO eq_rejections
+    (date, direction, entry_price, stop_price, stop_distance,
+     eq_level, sweep_wick, entry_time, strat_sequence, strat_bias,
+     target_1r, target_2r, target_3r)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_BUMP_SIGNALS_SQL = """
+    UPDATE session_log SET signals_fired = signals_fired + 1
+    WHERE date = ?
+"""
+
+_MARK_POSTSESSION_SQL = """
+    UPDATE session_log SET postsession_logged = 1
+    WHERE date = ?
+"""
+
+_BIAS_ACCURACY_SQL = """
+    SELECT COUNT(*) as total,
+           SUM(CASE WHEN bias_correct = 1 THEN 1 ELSE 0 END) as correct
+    FROM strat_log
+    WHERE bias != 'NEUTRAL' AND bias_correct IS NOT NULL
+"""
+
+_EQ_STATS_SQL = """
+    SELECT COUNT(*) as total,
+           SUM(CASE WHEN hit_1r = 1 THEN 1 ELSE 0 END) as wins_1r,
+           SUM(CASE WHEN hit_2r = 1 THEN 1 ELSE 0 END) as wins_2r,
+           SUM(CASE WHEN hit_3r = 1 THEN 1 ELSE 0 END) as wins_3r,
+           SUM(CASE WHEN stopped_out = 1 THEN 1 ELSE 0 END) as stopped
+    FROM eq_rejections
+    WHERE outcome IS NOT NULL
+"""
+
+_RECENT_SIGNALS_SQL = """
+    SELECT date, direction, entry_price, stop_distance,
+           strat_sequence, outcome
+    FROM eq_rejections
+    ORDER BY id DESC LIMIT 10
+"""
+
+_WEEKLY_SQL = """
+    SELECT date, sequence, bias, bias_pct, bias_correct
+    FROM strat_log
+    WHERE date >= date('now', '-7 days')
+    ORDER BY date
+"""
+
+_LATEST_PREMARKET_SQL = """
+    SELECT sequence, bias, bias_pct, pdh, pdl, pd_eq, pd_range
+    FROM strat_log ORDER BY date DESC LIMIT 1
+"""
+
 
 class FuturesMonitor:
     def __init__(self, config, logger, analyst=None):
@@ -43,9 +151,13 @@ class FuturesMonitor:
         self.telegram_enabled = config.get("telegram", {}).get("enabled", False)
         self.telegram_token = config.get("telegram", {}).get("bot_token", "")
         self.telegram_chat_id = config.get("telegram", {}).get("chat_id", "")
+        # Pooled session created on first send — keep-alive skips the TLS
+        # handshake on every message after the first
+        self._http = None
 
         # State
         self.today_bias = None
+        self.today_bias_pct = None
         self.today_sequence = None
         self.today_levels = None
         self.session_active = False
@@ -54,10 +166,29 @@ class FuturesMonitor:
         self.last_postsession_date = None
         self.last_5m_refresh_date = None
 
-        # Bias table cache (populated by _load_bias_table)
+        # Bias table cache (populated by _load_bias_table); the 64-slot
+        # list is the same table keyed by packed 2-bit candle codes, so
+        # the premarket lookup is one array index with no string build
         self._bias_table_cache = {}
+        self._bias_by_code = [("NEUTRAL", 0)] * 64
+
+        # Parsed CSVs keyed on file mtime — the 5m tick re-reads only when
+        # the broker process actually rewrote the file
+        self._daily_cache = (None, None)
+        self._5m_cache = (None, None)
+
+        # get_stats result, cached briefly for dashboard polling
+        self._stats_cache = (0.0, None)
+
+        # Today's date string, re-rendered only on rollover (same pattern
+        # as BudgetTracker's hot counters)
+        self._date_key = None
+        self._date_str = None
 
-        # Initialize database
+        # Initialize database — one persistent connection shared by the
+        # live-monitor loop and the dashboard thread, guarded by a lock
+        self.conn = None
+        self._db_lock = threading.Lock()
         self._init_db()
 
         self.logger.info(f"FuturesMonitor initialized: {self.instrument}")
@@ -71,9 +202,17 @@ class FuturesMonitor:
 
 
     def _init_db(self):
-        """Create futures tracking database."""
+        """Open the persistent connection and create tracking tables.
+
+        Reopening a connection per call paid connect + journal-init latency
+        on every 5-minute tick; WAL with synchronous=NORMAL keeps writes
+        durable without a full fsync per statement.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
             c = conn.cursor()
 
             c.execute("""
@@ -135,8 +274,15 @@ class FuturesMonitor:
                 )
             """)
 
+            # eq_rejections is scanned by date (weekly summary) and by
+            # outcome (stats aggregates); strat_log.date already has the
+            # implicit index from its UNIQUE constraint
+            c.execute("CREATE INDEX IF NOT EXISTS idx_eq_date ON eq_rejections(date)")
+            c.execute("""CREATE INDEX IF NOT EXISTS idx_eq_outcome
+                         ON eq_rejections(outcome) WHERE outcome IS NOT NULL""")
+
             conn.commit()
-            conn.close()
+            self.conn = conn
             self.logger.info("Futures database initialized")
         except Exception as e:
             self.logger.error(f"Futures DB init failed: {e}")
@@ -145,17 +291,33 @@ class FuturesMonitor:
     # DATA LOADING (from yfinance CSV files)
     # ================================================================
 
+    def _parse_index(self, index):
+        """Parse a Datetime index, dropping any timezone offset but keeping
+        wall-clock time — same result as the old per-row regex strip, done
+        vectorially in C instead of a Python regex pass per row."""
+        try:
+            idx = pd.to_datetime(index, format='ISO8601')
+        except ValueError:
+            # Mixed offsets (a DST boundary inside the window): normalize
+            # through UTC, then back to Eastern wall time
+            idx = pd.to_datetime(index, format='ISO8601', utc=True).tz_convert(ET)
+        if getattr(idx, 'tz', None) is not None:
+            idx = idx.tz_localize(None)
+        return idx
+
     def _load_daily_data(self):
-        """Load daily candle data from CSV."""
+        """Load daily candle data from CSV (reparsed only when it changes)."""
         try:
-            import pandas as pd
             filepath = os.path.join(self.data_dir, f"{self.instrument}_daily.csv")
             if not os.path.exists(filepath):
                 self.logger.error(f"Daily data not found: {filepath}")
                 return None
+            mtime = os.stat(filepath).st_mtime_ns
+            if mtime == self._daily_cache[0]:
+                return self._daily_cache[1]
             df = pd.read_csv(filepath, index_col='Datetime')
-            df.index = pd.to_datetime(df.index.astype(str).str.replace(
-                r'[-+]\d{2}:\d{2}$', '', regex=True))
+            df.index = self._parse_index(df.index)
+            self._daily_cache = (mtime, df)
             return df
         except Exception as e:
             self.logger.error(f"Failed to load daily data: {e}")
@@ -165,7 +327,6 @@ class FuturesMonitor:
         """Pull fresh daily OHLCV from yfinance before premarket analysis."""
         try:
             import yfinance as yf
-            import pandas as pd
             ticker_map = {"ES": "ES=F", "NQ": "NQ=F", "MES": "MES=F", "MNQ": "MNQ=F"}
             ticker = ticker_map.get(self.instrument, f"{self.instrument}=F")
 
@@ -195,7 +356,6 @@ class FuturesMonitor:
         """Pull fresh 5m OHLCV from yfinance (called once per session day)."""
         try:
             import yfinance as yf
-            import pandas as pd
             ticker_map = {"ES": "ES=F", "NQ": "NQ=F", "MES": "MES=F", "MNQ": "MNQ=F"}
             ticker = ticker_map.get(self.instrument, f"{self.instrument}=F")
 
@@ -220,15 +380,27 @@ class FuturesMonitor:
             self.logger.error(f"5m data refresh failed: {e}")
 
     def _load_5m_data(self):
-        """Load 5-minute candle data from CSV."""
+        """Load 5-minute candle data from CSV (reparsed only when it changes)."""
         try:
-            import pandas as pd
             filepath = os.path.join(self.data_dir, f"{self.instrument}_5m.csv")
             if not os.path.exists(filepath):
                 return None
-            df = pd.read_csv(filepath, index_col='Datetime')
-            df.index = pd.to_datetime(df.index.astype(str).str.replace(
-                r'[-+]\d{2}:\d{2}$', '', regex=True))
+            mtime = os.stat(filepath).st_mtime_ns
+            if mtime == self._5m_cache[0]:
+                return self._5m_cache[1]
+            # Parse only the header plus the last chunk of the file
+            with open(filepath, 'rb') as f:
+                header = f.readline()
+                size = os.fstat(f.fileno()).st_size
+                if size - len(header) > _5M_TAIL_BYTES:
+                    f.seek(-_5M_TAIL_BYTES, os.SEEK_END)
+                    chunk = f.read()
+                    chunk = chunk[chunk.index(b'\n') + 1:]
+                else:
+                    chunk = f.read()
+            df = pd.read_csv(io.BytesIO(header + chunk), index_col='Datetime')
+            df.index = self._parse_index(df.index)
+            self._5m_cache = (mtime, df)
             return df
         except Exception as e:
             self.logger.error(f"Failed to load 5m data: {e}")
@@ -238,69 +410,76 @@ class FuturesMonitor:
     # STRAT CLASSIFICATION
     # ================================================================
 
-    def _classify_strat(self, curr_high, curr_low, prev_high, prev_low):
-        """Classify a candle using The Strat methodology."""
-        broke_high = curr_high > prev_high
-        broke_low = curr_low < prev_low
+    @staticmethod
+    def _classify_strat_series(highs, lows):
+        """Classify a whole high/low history into Strat codes in one pass.
 
-        if broke_high and broke_low:
-            return "3"
-        elif broke_high:
-            return "2U"
-        elif broke_low:
-            return "2D"
-        else:
-            return "1"
+        Returns a uint8 array of (broke_high << 1) | broke_low codes for
+        candles 1..N — indexes into _STRAT_LABELS. Runs at C speed over
+        years of dailies, so future bias backtests over the full
+        bias_correct history stay O(N) array ops instead of a Python loop.
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        return ((highs[1:] > highs[:-1]).astype(np.uint8) << 1) | \
+            (lows[1:] < lows[:-1]).astype(np.uint8)
 
     def _get_strat_sequence(self, daily_df):
         """Get the current 3-candle Strat sequence and bias."""
         if daily_df is None or len(daily_df) < 4:
             return None, None, 0
 
-        # Classify last 3 candles
-        s1 = self._classify_strat(
-            daily_df.iloc[-3]['High'], daily_df.iloc[-3]['Low'],
-            daily_df.iloc[-4]['High'], daily_df.iloc[-4]['Low']
-        )
-        s2 = self._classify_strat(
-            daily_df.iloc[-2]['High'], daily_df.iloc[-2]['Low'],
-            daily_df.iloc[-3]['High'], daily_df.iloc[-3]['Low']
-        )
-        s3 = self._classify_strat(
-            daily_df.iloc[-1]['High'], daily_df.iloc[-1]['Low'],
-            daily_df.iloc[-2]['High'], daily_df.iloc[-2]['Low']
-        )
-
+        # Classify last 3 candles in one vector pass — each .iloc[...]
+        # scalar read was a Python-level pandas dispatch
+        codes = self._classify_strat_series(daily_df['High'].to_numpy()[-4:],
+                                            daily_df['Low'].to_numpy()[-4:])
+        s1, s2, s3 = (_STRAT_LABELS[c] for c in codes)
         sequence = f"{s1}-{s2}-{s3}"
-        bias, pct = self._lookup_bias(sequence)
+
+        # The three 2-bit codes pack into a 6-bit key, so the bias lookup
+        # is one list index — the sequence string is only built for
+        # logging and the DB record
+        if not self._bias_table_cache:
+            self._load_bias_table()
+        bias, pct = self._bias_by_code[(codes[0] << 4) | (codes[1] << 2) | codes[2]]
 
         return sequence, bias, pct
 
     def _load_bias_table(self):
-        """Load bias table from strat_bias_lookup.json (source of truth)."""
+        """Load bias table from strat_bias_lookup.json (source of truth).
+
+        Entries are resolved to final (direction, confidence) tuples here
+        so _lookup_bias — hit by both the sequence calc and every dashboard
+        poll — is a single dict get with no per-call re-derivation.
+        Sequences with < 60% confidence resolve to NEUTRAL (near-random noise).
+        """
         try:
             json_path = os.path.join(os.path.dirname(self.data_dir), 'strat_bias_lookup.json')
             with open(json_path) as f:
-                self._bias_table_cache = json.load(f)
+                raw = json.load(f)
+            self._bias_table_cache = {
+                seq: (("BULL" if entry['is_bullish'] else "BEAR"), entry['confidence'])
+                if entry['confidence'] >= 60 else ("NEUTRAL", 0)
+                for seq, entry in raw.items()
+            }
+            table = [("NEUTRAL", 0)] * 64
+            for seq, resolved in self._bias_table_cache.items():
+                try:
+                    a, b, c = (_STRAT_CODES[p] for p in seq.split("-"))
+                except (KeyError, ValueError):
+                    continue
+                table[(a << 4) | (b << 2) | c] = resolved
+            self._bias_by_code = table
             self.logger.info(f"Bias table loaded: {len(self._bias_table_cache)} sequences from JSON")
         except Exception as e:
             self.logger.error(f"Failed to load bias table JSON: {e}")
             self._bias_table_cache = {}
 
     def _lookup_bias(self, sequence):
-        """Lookup directional bias from strat_bias_lookup.json.
-        Returns NEUTRAL for sequences with < 60% confidence (near-random noise).
-        """
+        """Lookup directional bias for a Strat sequence."""
         if not self._bias_table_cache:
             self._load_bias_table()
-        entry = self._bias_table_cache.get(sequence)
-        if entry is None:
-            return ("NEUTRAL", 0)
-        confidence = entry['confidence']
-        if confidence < 60:
-            return ("NEUTRAL", 0)
-        direction = "BULL" if entry['is_bullish'] else "BEAR"
-        return (direction, confidence)
+        return self._bias_table_cache.get(sequence, ("NEUTRAL", 0))
 
     def _get_key_levels(self, daily_df):
         """Calculate PDH, PDL, EQ from the previous day."""
@@ -313,23 +492,31 @@ class FuturesMonitor:
         pd_eq = (pdh + pdl) / 2.0
         pd_range = pdh - pdl
 
-        return {
-            'pdh': pdh,
-            'pdl': pdl,
-            'pd_eq': pd_eq,
-            'pd_range': pd_range,
-            'premium': pdl + (pd_range * 0.75),
-            'discount': pdl + (pd_range * 0.25),
-        }
+        return Levels(
+            pdh=pdh,
+            pdl=pdl,
+            pd_eq=pd_eq,
+            pd_range=pd_range,
+            premium=pdl + (pd_range * 0.75),
+            discount=pdl + (pd_range * 0.25),
+        )
 
     # ================================================================
     # PRE-MARKET BRIEF (run at 9:00 AM ET)
     # ================================================================
 
+    def _today_str(self, now):
+        """Cached YYYY-MM-DD — strftime is a locale-aware C call and the
+        answer changes once a day, not once per 5m tick."""
+        if now.date() != self._date_key:
+            self._date_key = now.date()
+            self._date_str = now.strftime("%Y-%m-%d")
+        return self._date_str
+
     def run_premarket(self, force=False):
         """Generate and send pre-market brief."""
         now = datetime.now(ET)
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = self._today_str(now)
 
         if self.last_premarket_date == today_str and not force:
             return None  # Already sent today
@@ -351,27 +538,20 @@ class FuturesMonitor:
 
         self.today_sequence = sequence
         self.today_bias = bias
+        self.today_bias_pct = pct
         self.today_levels = levels
         self.signal_fired_today = False
 
-        # Log to database
+        # Log to database — both inserts in one transaction (one fsync),
+        # rolled back together if either fails
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute("""
-                INSERT OR REPLACE INTO strat_log
-                (date, sequence, bias, bias_pct, pdh, pdl, pd_eq, pd_range)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (today_str, sequence, bias, pct,
-                  levels['pdh'], levels['pdl'], levels['pd_eq'], levels['pd_range']))
-
-            c.execute("""
-                INSERT OR REPLACE INTO session_log (date, premarket_sent)
-                VALUES (?, 1)
-            """, (today_str,))
-
-            conn.commit()
-            conn.close()
+            with self._db_lock, self.conn:
+                self.conn.execute(_INSERT_STRAT_SQL,
+                                  (today_str, sequence, bias, pct,
+                                   levels.pdh, levels.pdl,
+                                   levels.pd_eq, levels.pd_range))
+                self.conn.execute(_MARK_PREMARKET_SQL, (today_str,))
+            self._stats_cache = (0.0, None)
         except Exception as e:
             self.logger.error(f"DB log failed: {e}")
 
@@ -386,17 +566,17 @@ class FuturesMonitor:
             "sequence": sequence,
             "bias": bias,
             "bias_pct": pct,
-            "levels": levels,
+            "levels": asdict(levels),
             "message": (
                 f"📊 PRE-MARKET BRIEF — {self.instrument}\n"
                 f"━━━━━━━━━━━━━━━━━━━━\n"
                 f"Sequence: {sequence}\n"
                 f"{bias_icon} Bias: {bias} {pct}%\n"
                 f"━━━━━━━━━━━━━━━━━━━━\n"
-                f"PDH: {levels['pdh']:.2f}\n"
-                f"EQ:  {levels['pd_eq']:.2f}\n"
-                f"PDL: {levels['pdl']:.2f}\n"
-                f"Range: {levels['pd_range']:.1f} pts\n"
+                f"PDH: {levels.pdh:.2f}\n"
+                f"EQ:  {levels.pd_eq:.2f}\n"
+                f"PDL: {levels.pdl:.2f}\n"
+                f"Range: {levels.pd_range:.1f} pts\n"
                 f"━━━━━━━━━━━━━━━━━━━━\n"
                 f"{'✅ Look ' + direction + ' only' if bias != 'NEUTRAL' else '⚪ No strong bias — be selective'}"
             )
@@ -420,18 +600,24 @@ class FuturesMonitor:
         Call this every 5 minutes during session.
         Returns signal dict if triggered, None otherwise.
         """
-        if not self.today_levels or self.signal_fired_today:
+        # All the cheap gates run before any file work — most ticks exit
+        # here without touching the CSV at all
+        if self.signal_fired_today or not self.today_levels:
             return None
 
         now = datetime.now(ET)
-        today_str = now.strftime("%Y-%m-%d")
+        minute_of_day = now.hour * 60 + now.minute
+        if not 570 <= minute_of_day <= 660:  # outside 9:30-11:00 session
+            return None
+
+        today_str = self._today_str(now)
 
         # Refresh 5m data once per session day so today's candles are available
         if self.last_5m_refresh_date != today_str:
             self._refresh_5m_data()
             self.last_5m_refresh_date = today_str
 
-        pd_eq = self.today_levels['pd_eq']
+        pd_eq = self.today_levels.pd_eq
         eq_upper = pd_eq + self.eq_buffer
         eq_lower = pd_eq - self.eq_buffer
 
@@ -439,16 +625,12 @@ class FuturesMonitor:
         if df_5m is None or len(df_5m) < 5:
             return None
 
-        today_str = now.strftime("%Y-%m-%d")
-        from datetime import time as dt_time
-
-        # Get today's session candles
-        mask = (
-            (df_5m.index.date == now.date()) &
-            (df_5m.index.time >= dt_time(9, 30)) &
-            (df_5m.index.time <= dt_time(11, 0))
-        )
-        session = df_5m[mask]
+        # Today's session candles — a pure int64 comparison on the raw
+        # datetime64 index; .date/.time built a Python object per row
+        session_start = np.datetime64(now.date()) + np.timedelta64(570, 'm')  # 9:30
+        session_end = np.datetime64(now.date()) + np.timedelta64(660, 'm')    # 11:00
+        idx = df_5m.index.values
+        session = df_5m[(idx >= session_start) & (idx <= session_end)]
 
         if len(session) < 3:
             return None
@@ -509,18 +691,13 @@ class FuturesMonitor:
     def _build_signal(self, direction, entry, stop, stop_dist, eq,
                       sweep_price, entry_time, date_str):
         """Build a signal dict with all trade info."""
-        if direction == "LONG":
-            t1r = entry + stop_dist
-            t15r = entry + (stop_dist * 1.5)
-            t2r = entry + (stop_dist * 2.0)
-            t3r = entry + (stop_dist * 3.0)
-            icon = "🟢"
-        else:
-            t1r = entry - stop_dist
-            t15r = entry - (stop_dist * 1.5)
-            t2r = entry - (stop_dist * 2.0)
-            t3r = entry - (stop_dist * 3.0)
-            icon = "🔴"
+        # One signed step collapses the duplicated long/short target math
+        step = stop_dist if direction == "LONG" else -stop_dist
+        t1r = entry + step
+        t15r = entry + step * 1.5
+        t2r = entry + step * 2.0
+        t3r = entry + step * 3.0
+        icon = "🟢" if direction == "LONG" else "🔴"
 
         bias_confirm = ""
         if self.today_bias:
@@ -568,30 +745,19 @@ class FuturesMonitor:
     def _log_signal(self, signal):
         """Log EQ Rejection signal to database."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute("""
-                INSERT INTO eq_rejections
-                (date, direction, entry_price, stop_price, stop_distance,
-                 eq_level, sweep_wick, entry_time, strat_sequence, strat_bias,
-                 target_1r, target_2r, target_3r)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                signal['date'], signal['direction'], signal['entry'],
-                signal['stop'], signal['stop_distance'], signal['eq_level'],
-                signal['sweep_price'], signal['entry_time'],
-                signal['strat_sequence'], signal['strat_bias'],
-                signal['t1r'], signal['t2r'], signal['t3r']
-            ))
-
-            # Update session log
-            c.execute("""
-                UPDATE session_log SET signals_fired = signals_fired + 1
-                WHERE date = ?
-            """, (signal['date'],))
-
-            conn.commit()
-            conn.close()
+            # One transaction for the insert + session counter update
+            with self._db_lock, self.conn:
+                self.conn.execute(_INSERT_EQ_SQL, (
+                    signal['date'], signal['direction'], signal['entry'],
+                    signal['stop'], signal['stop_distance'], signal['eq_level'],
+                    signal['sweep_price'], signal['entry_time'],
+                    signal['strat_sequence'], signal['strat_bias'],
+                    signal['t1r'], signal['t2r'], signal['t3r']
+                ))
+
+                # Update session log
+                self.conn.execute(_BUMP_SIGNALS_SQL, (signal['date'],))
+            self._stats_cache = (0.0, None)
         except Exception as e:
             self.logger.error(f"Signal log failed: {e}")
 
@@ -602,7 +768,7 @@ class FuturesMonitor:
     def run_postsession(self):
         """Log session results after NY session ends."""
         now = datetime.now(ET)
-        today_str = now.strftime("%Y-%m-%d")
+        today_str = self._today_str(now)
 
         if self.last_postsession_date == today_str:
             return None
@@ -623,14 +789,9 @@ class FuturesMonitor:
         }
 
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute("""
-                UPDATE session_log SET postsession_logged = 1
-                WHERE date = ?
-            """, (today_str,))
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                self.conn.execute(_MARK_POSTSESSION_SQL, (today_str,))
+                self.conn.commit()
         except Exception as e:
             self.logger.error(f"Post-session log failed: {e}")
 
@@ -642,61 +803,49 @@ class FuturesMonitor:
     # ================================================================
 
     def get_stats(self):
-        """Get running stats for dashboard."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-
-            # Strat bias accuracy
-            c.execute("""
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN bias_correct = 1 THEN 1 ELSE 0 END) as correct
-                FROM strat_log
-                WHERE bias != 'NEUTRAL' AND bias_correct IS NOT NULL
-            """)
-            row = c.fetchone()
-            bias_total = row[0] or 0
-            bias_correct = row[1] or 0
-            bias_accuracy = (bias_correct / bias_total * 100) if bias_total > 0 else 0
+        """Get running stats for dashboard.
 
-            # EQ Rejection stats
-            c.execute("""
-                SELECT COUNT(*) as total,
-                       SUM(CASE WHEN hit_1r = 1 THEN 1 ELSE 0 END) as wins_1r,
-                       SUM(CASE WHEN hit_2r = 1 THEN 1 ELSE 0 END) as wins_2r,
-                       SUM(CASE WHEN hit_3r = 1 THEN 1 ELSE 0 END) as wins_3r,
-                       SUM(CASE WHEN stopped_out = 1 THEN 1 ELSE 0 END) as stopped
-                FROM eq_rejections
-                WHERE outcome IS NOT NULL
-            """)
-            eq_row = c.fetchone()
-
-            # Recent signals
-            c.execute("""
-                SELECT date, direction, entry_price, stop_distance,
-                       strat_sequence, outcome
-                FROM eq_rejections
-                ORDER BY id DESC LIMIT 10
-            """)
-            recent = [
-                {
-                    "date": r[0], "direction": r[1], "entry": r[2],
-                    "stop_dist": r[3], "sequence": r[4], "outcome": r[5]
-                }
-                for r in c.fetchall()
-            ]
-
-            # Total sessions logged
-            c.execute("SELECT COUNT(*) FROM session_log")
-            total_sessions = c.fetchone()[0] or 0
-
-            conn.close()
+        Cached for 30s: outcomes change a few times a day at most, but the
+        frontend polls constantly — no reason to run four queries per poll.
+        """
+        ts, cached = self._stats_cache
+        if cached is not None and time.time() - ts < 30:
+            return cached
 
-            return {
+        try:
+            with self._db_lock:
+                c = self.conn.cursor()
+
+                # Strat bias accuracy
+                c.execute(_BIAS_ACCURACY_SQL)
+                row = c.fetchone()
+                bias_total = row[0] or 0
+                bias_correct = row[1] or 0
+                bias_accuracy = (bias_correct / bias_total * 100) if bias_total > 0 else 0
+
+                # EQ Rejection stats
+                c.execute(_EQ_STATS_SQL)
+                eq_row = c.fetchone()
+
+                # Recent signals
+                c.execute(_RECENT_SIGNALS_SQL)
+                recent = [
+                    {
+                        "date": r[0], "direction": r[1], "entry": r[2],
+                        "stop_dist": r[3], "sequence": r[4], "outcome": r[5]
+                    }
+                    for r in c.fetchall()
+                ]
+
+                # Total sessions logged
+                c.execute("SELECT COUNT(*) FROM session_log")
+                total_sessions = c.fetchone()[0] or 0
+
+            stats = {
                 "instrument": self.instrument,
                 "current_sequence": self.today_sequence,
                 "current_bias": self.today_bias,
-                "current_levels": self.today_levels,
+                "current_levels": asdict(self.today_levels) if self.today_levels else None,
                 "bias_accuracy": {
                     "total": bias_total,
                     "correct": bias_correct,
@@ -713,6 +862,8 @@ class FuturesMonitor:
                 "total_sessions": total_sessions,
                 "signal_today": self.signal_fired_today,
             }
+            self._stats_cache = (time.time(), stats)
+            return stats
 
         except Exception as e:
             self.logger.error(f"Stats error: {e}")
@@ -721,17 +872,9 @@ class FuturesMonitor:
     def get_weekly_summary(self):
         """Generate weekly summary for Telegram/dashboard."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-
-            c.execute("""
-                SELECT date, sequence, bias, bias_pct, bias_correct
-                FROM strat_log
-                WHERE date >= date('now', '-7 days')
-                ORDER BY date
-            """)
-            week = c.fetchall()
-            conn.close()
+            with self._db_lock:
+                c = self.conn.execute(_WEEKLY_SQL)
+                week = c.fetchall()
 
             if not week:
                 return None
@@ -740,21 +883,25 @@ class FuturesMonitor:
             biased = [w for w in week if w[2] != 'NEUTRAL']
             correct = [w for w in biased if w[4] == 1]
 
-            summary = (
-                f"📊 WEEKLY STRAT SUMMARY — {self.instrument}\n"
-                f"━━━━━━━━━━━━━━━━━━━━\n"
-                f"Sessions: {total}\n"
-                f"Biased days: {len(biased)}/{total}\n"
-                f"Bias accuracy: {len(correct)}/{len(biased)} "
-                f"({len(correct)/len(biased)*100:.0f}%)\n" if biased else ""
-                f"━━━━━━━━━━━━━━━━━━━━\n"
-            )
+            # Built as a list + join: the old conditional expression inside
+            # the implicit concatenation made `if biased else ""` swallow
+            # the whole header (and the closing rule) on bias-free weeks
+            parts = [
+                f"📊 WEEKLY STRAT SUMMARY — {self.instrument}\n",
+                f"━━━━━━━━━━━━━━━━━━━━\n",
+                f"Sessions: {total}\n",
+                f"Biased days: {len(biased)}/{total}\n",
+            ]
+            if biased:
+                parts.append(f"Bias accuracy: {len(correct)}/{len(biased)} "
+                             f"({len(correct)/len(biased)*100:.0f}%)\n")
+            parts.append("━━━━━━━━━━━━━━━━━━━━\n")
 
             for day in week:
                 icon = "✅" if day[4] == 1 else "❌" if day[4] == 0 else "⚪"
-                summary += f"  {day[0]}: {day[1]} → {day[2]} {day[3]}% {icon}\n"
+                parts.append(f"  {day[0]}: {day[1]} → {day[2]} {day[3]}% {icon}\n")
 
-            return summary
+            return "".join(parts)
 
         except Exception as e:
             self.logger.error(f"Weekly summary error: {e}")
@@ -770,9 +917,10 @@ class FuturesMonitor:
             return False
 
         try:
-            import requests
+            if self._http is None:
+                self._http = requests.Session()
             url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
-            resp = requests.post(url, json={
+            resp = self._http.post(url, json={
                 "chat_id": self.telegram_chat_id,
                 "text": message,
                 "parse_mode": "HTML"
@@ -787,24 +935,22 @@ class FuturesMonitor:
     # ================================================================
 
     def get_dashboard_data(self):
-        """Return data for the Jarvis web dashboard."""
-        # Extract bias confidence from sequence lookup
-        bias_conf = 0
-        if self.today_sequence:
-            _, conf = self._lookup_bias(self.today_sequence)
-            bias_conf = conf
-        
+        """Return data for the Jarvis web dashboard.
+
+        Every field here is instance state or the 30s-cached stats blob,
+        so a poll costs no queries and no bias re-lookup.
+        """
         return {
             "enabled": self.enabled,
             "instrument": self.instrument,
             "strat_sequence": self.today_sequence,  # Match frontend
             "sequence": self.today_sequence,  # Keep for compatibility
             "bias": self.today_bias,
-            "bias_confidence": bias_conf,
-            "pdh": self.today_levels.get('pdh') if self.today_levels else None,
-            "pdl": self.today_levels.get('pdl') if self.today_levels else None,
-            "eq": self.today_levels.get('pd_eq') if self.today_levels else None,
-            "levels": self.today_levels,
+            "bias_confidence": self.today_bias_pct or 0,
+            "pdh": self.today_levels.pdh if self.today_levels else None,
+            "pdl": self.today_levels.pdl if self.today_levels else None,
+            "eq": self.today_levels.pd_eq if self.today_levels else None,
+            "levels": asdict(self.today_levels) if self.today_levels else None,
             "signal_today": self.signal_fired_today,
             "signals_today": 1 if self.signal_fired_today else 0,
             "stats": self.get_stats(),
@@ -814,27 +960,23 @@ class FuturesMonitor:
     def _load_latest_from_db(self):
         """Load the most recent premarket analysis from database on startup."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute("""
-                SELECT sequence, bias, bias_pct, pdh, pdl, pd_eq, pd_range
-                FROM strat_log ORDER BY date DESC LIMIT 1
-            """)
-            result = c.fetchone()
-            conn.close()
-            
+            with self._db_lock:
+                c = self.conn.execute(_LATEST_PREMARKET_SQL)
+                result = c.fetchone()
+
             if result:
                 seq, bias, pct, pdh, pdl, eq, rng = result
                 self.today_sequence = seq
                 self.today_bias = bias
-                self.today_levels = {
-                    'pdh': float(pdh), 
-                    'pdl': float(pdl), 
-                    'pd_eq': float(eq), 
-                    'pd_range': float(rng),
-                    'premium': float(pdl) + (float(rng) * 0.75), 
-                    'discount': float(pdl) + (float(rng) * 0.25)
-                }
+                self.today_bias_pct = pct
+                self.today_levels = Levels(
+                    pdh=float(pdh),
+                    pdl=float(pdl),
+                    pd_eq=float(eq),
+                    pd_range=float(rng),
+                    premium=float(pdl) + (float(rng) * 0.75),
+                    discount=float(pdl) + (float(rng) * 0.25),
+                )
                 self.logger.info(f"Loaded from DB: {seq} → {bias} {pct}%")
             else:
                 self.logger.info("No premarket data in DB yet")
@@ -0,0 +1,40 @@
+"""
+Jarvis JSON helpers
+Shared fast-path serialization: orjson's C implementation when installed
+(3-10x faster than stdlib json), stdlib fallback with matching output.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj, indent=False):
+        # OPT_SERIALIZE_NUMPY keeps np.float64 levels as JSON numbers —
+        # without it default=str would turn them into strings, which the
+        # stdlib fallback (and the dashboard) never sees
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option).decode()
+
+    def loads(data):
+        return orjson.loads(data)
+else:
+    def dumps(obj, indent=False):
+        return json.dumps(obj, indent=2 if indent else None, default=str)
+
+    def loads(data):
+        return json.loads(data)
+
+
+def atomic_write(path, obj, indent=True):
+    """Serialize obj to path via temp file + os.replace so a crash
+    mid-write can never truncate the real file to zero bytes."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(dumps(obj, indent=indent))
+    os.replace(tmp, path)
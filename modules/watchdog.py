@@ -3,31 +3,125 @@ Jarvis Watchdog Module
 Monitors bot processes, checks heartbeats, auto-restarts crashed bots.
 """
 
+import atexit
+import socket
 import subprocess
 import time
 import sqlite3
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 
+try:
+    import requests
+except ImportError:
+    requests = None  # deep dashboard probes degrade gracefully
+
 
 class Watchdog:
     def __init__(self, config, logger):
         self.config = config
         self.logger = logger
-        self.restart_history = {}  # bot_name -> [(timestamp, success)]
-
-    def check_screen_session(self, screen_name):
+        self.max_attempts = config["watchdog"]["max_restart_attempts"]
+        # bot_name -> (timestamp, success) entries; maxlen bounds memory over
+        # a long-running daemon where a plain list only ever grew
+        self.restart_history = defaultdict(
+            lambda: deque(maxlen=max(64, self.max_attempts * 4)))
+        self._screen_cache = (0.0, "")  # (timestamp, screen -ls output)
+        self._db_conns = {}  # db_path -> pooled sqlite connection
+        self._http = None  # lazy requests.Session for dashboard probes
+        self._ts_fmt = {}  # bot_name -> detected trade-timestamp format
+        atexit.register(self._close_all_db_conns)
+
+    def _close_all_db_conns(self):
+        """Shutdown hook: run PRAGMA optimize against every tracked bot DB
+        so sqlite refreshes its query-planner stats, then close the pool"""
+        for db_path, conn in list(self._db_conns.items()):
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                # Pooled handle is read-only — optimize needs a writable one
+                try:
+                    rw = sqlite3.connect(db_path, timeout=2)
+                    rw.execute("PRAGMA optimize")
+                    rw.close()
+                except Exception:
+                    pass
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._db_conns.clear()
+
+    def _get_db_conn(self, db_path):
+        """Persistent read-only connection per bot DB — connect() itself is
+        the dominant cost of this one-row freshness query"""
+        conn = self._db_conns.get(db_path)
+        if conn is None:
+            # Read-only open: no journal/lock file writes for a health probe,
+            # and mmap keeps the page reads out of syscalls
+            try:
+                conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True,
+                                       check_same_thread=False)
+                conn.execute("PRAGMA query_only=1")
+            except sqlite3.OperationalError:
+                # DB may not exist yet — fall back to a normal open
+                conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA mmap_size=67108864")
+            self._ensure_trades_index(db_path)
+            self._db_conns[db_path] = conn
+        return conn
+
+    def _ensure_trades_index(self, db_path):
+        """One-time: index trades(timestamp) so the freshness query is a
+        single B-tree descent instead of a full-table MAX scan"""
+        try:
+            rw = sqlite3.connect(db_path, timeout=5)
+            try:
+                rw.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_trades_ts "
+                    "ON trades(timestamp DESC)"
+                )
+                rw.commit()
+            finally:
+                rw.close()
+        except Exception:
+            # Locked, missing table, or read-only filesystem — the query
+            # below still works, just without the index
+            pass
+
+    def _list_screens(self, max_age=1.0):
+        """Get `screen -ls` output, reusing a recent listing when available"""
+        cached_at, output = self._screen_cache
+        if time.time() - cached_at < max_age:
+            return output
+
+        result = subprocess.run(
+            ["screen", "-ls"],
+            capture_output=True, text=True, timeout=5
+        )
+        self._screen_cache = (time.time(), result.stdout)
+        return result.stdout
+
+    def check_screen_session(self, screen_name, max_age=1.0):
         """Check if a screen session is running"""
         try:
-            result = subprocess.run(
-                ["screen", "-ls"],
-                capture_output=True, text=True, timeout=5
-            )
-            return screen_name in result.stdout
+            return screen_name in self._list_screens(max_age)
         except Exception as e:
             self.logger.error(f"Screen check error: {e}")
             return False
 
-    def check_process_alive(self, bot_name, bot_config):
+    def _wait_for_screen(self, screen_name, expected, timeout, interval=0.05):
+        """Poll the screen list until the session reaches the expected state
+        or the timeout passes. Returns the final aliveness."""
+        deadline = time.time() + timeout
+        while True:
+            alive = self.check_screen_session(screen_name, max_age=0.0)
+            if alive is expected or time.time() >= deadline:
+                return alive
+            time.sleep(interval)
+
+    def check_process_alive(self, bot_name, bot_config, checked_at=None):
         """Check if a bot's process is alive via screen session"""
         screen_name = bot_config["screen_name"]
         is_alive = self.check_screen_session(screen_name)
@@ -36,47 +130,70 @@ class Watchdog:
             "bot": bot_name,
             "alive": is_alive,
             "screen_name": screen_name,
-            "checked_at": datetime.now(timezone.utc).isoformat()
+            "checked_at": checked_at or datetime.now(timezone.utc).isoformat()
         }
 
-    def check_db_freshness(self, bot_name, bot_config):
+    def _parse_trade_ts(self, bot_name, last_trade_str):
+        """Parse a trade timestamp, remembering which ISO variant the bot
+        writes so later passes skip straight to the right branch"""
+        fmt = self._ts_fmt.get(bot_name)
+        if fmt is not None:
+            try:
+                if fmt == "Z":
+                    return datetime.fromisoformat(last_trade_str.replace('Z', '+00:00'))
+                if fmt == "TZ":
+                    return datetime.fromisoformat(last_trade_str)
+                return datetime.fromisoformat(last_trade_str).replace(tzinfo=timezone.utc)
+            except ValueError:
+                del self._ts_fmt[bot_name]  # format changed — re-detect
+
+        # Handle ISO format timestamps (with or without timezone)
+        try:
+            if 'Z' in last_trade_str:
+                fmt = "Z"
+                last_trade = datetime.fromisoformat(last_trade_str.replace('Z', '+00:00'))
+            elif '+' in last_trade_str or last_trade_str.endswith('00:00'):
+                fmt = "TZ"
+                last_trade = datetime.fromisoformat(last_trade_str)
+            else:
+                # No timezone info - assume UTC
+                fmt = "NAIVE"
+                last_trade = datetime.fromisoformat(last_trade_str).replace(tzinfo=timezone.utc)
+        except Exception:
+            # Fallback - try without timezone then add UTC
+            try:
+                last_trade = datetime.fromisoformat(last_trade_str.split('+')[0].split('Z')[0])
+                return last_trade.replace(tzinfo=timezone.utc)
+            except:
+                return None
+
+        self._ts_fmt[bot_name] = fmt
+        return last_trade
+
+    def check_db_freshness(self, bot_name, bot_config, now=None):
         """Check if the bot's database has been updated recently"""
         db_path = bot_config["db_path"]
         stale_threshold = self.config["watchdog"]["stale_threshold"]
 
         try:
-            conn = sqlite3.connect(db_path)
+            conn = self._get_db_conn(db_path)
             c = conn.cursor()
-            c.execute("SELECT MAX(timestamp) FROM trades")
+            c.execute("SELECT timestamp FROM trades ORDER BY timestamp DESC LIMIT 1")
             result = c.fetchone()
-            conn.close()
 
             if not result or not result[0]:
                 return {"fresh": False, "last_trade": None, "stale_seconds": None}
 
             last_trade_str = result[0]
-            # Handle both ISO formats
-            try:
-                # Handle ISO format timestamps (with or without timezone)
-                if 'Z' in last_trade_str:
-                    last_trade = datetime.fromisoformat(last_trade_str.replace('Z', '+00:00'))
-                elif '+' in last_trade_str or last_trade_str.endswith('00:00'):
-                    last_trade = datetime.fromisoformat(last_trade_str)
-                else:
-                    # No timezone info - assume UTC
-                    last_trade = datetime.fromisoformat(last_trade_str).replace(tzinfo=timezone.utc)
-            except Exception as e:
-                # Fallback - try without timezone then add UTC
-                try:
-                    last_trade = datetime.fromisoformat(last_trade_str.split('+')[0].split('Z')[0])
-                    last_trade = last_trade.replace(tzinfo=timezone.utc)
-                except:
-                    return {"fresh": False, "last_trade": None, "stale_seconds": None}
+            last_trade = self._parse_trade_ts(bot_name, last_trade_str)
+            if last_trade is None:
+                return {"fresh": False, "last_trade": None, "stale_seconds": None}
 
             if last_trade.tzinfo is None:
                 last_trade = last_trade.replace(tzinfo=timezone.utc)
 
-            now = datetime.now(timezone.utc)
+            if now is None:
+                now = datetime.now(timezone.utc)
             stale_seconds = (now - last_trade).total_seconds()
 
             return {
@@ -87,6 +204,14 @@ class Watchdog:
 
         except Exception as e:
             self.logger.error(f"DB freshness check error for {bot_name}: {e}")
+            # Drop the pooled connection so the next pass reconnects —
+            # the DB may have been created or replaced since we opened it
+            stale_conn = self._db_conns.pop(db_path, None)
+            if stale_conn is not None:
+                try:
+                    stale_conn.close()
+                except Exception:
+                    pass
             return {"fresh": False, "last_trade": None, "stale_seconds": None}
 
     def restart_bot(self, bot_name, bot_config):
@@ -100,23 +225,24 @@ class Watchdog:
                 "message": "Bot is managed manually"
             }
 
-        max_attempts = self.config["watchdog"]["max_restart_attempts"]
+        max_attempts = self.max_attempts
         cooldown = self.config["watchdog"]["restart_cooldown"]
 
         # Check restart history
         now = time.time()
-        history = self.restart_history.get(bot_name, [])
+        history = self.restart_history[bot_name]
 
-        # Clean old entries beyond cooldown
-        history = [(ts, s) for ts, s in history if now - ts < cooldown * max_attempts]
-        recent = [ts for ts, s in history if now - ts < cooldown]
+        # Drop entries beyond the cooldown window from the front
+        while history and now - history[0][0] >= cooldown * max_attempts:
+            history.popleft()
+        recent = sum(1 for ts, s in history if now - ts < cooldown)
 
-        if len(recent) >= max_attempts:
+        if recent >= max_attempts:
             self.logger.warning(f"Max restart attempts reached for {bot_name}")
             return {
                 "success": False,
                 "reason": "max_attempts_exceeded",
-                "attempts": len(recent)
+                "attempts": recent
             }
 
         # Attempt restart
@@ -131,7 +257,7 @@ class Watchdog:
                 ["screen", "-S", screen_name, "-X", "quit"],
                 capture_output=True, timeout=5
             )
-            time.sleep(1)
+            self._wait_for_screen(screen_name, expected=False, timeout=2.0)
 
             # Start new screen session
             if venv_path:
@@ -144,13 +270,11 @@ class Watchdog:
                 capture_output=True, timeout=10
             )
 
-            time.sleep(3)
-
-            # Verify it started
-            is_alive = self.check_screen_session(screen_name)
+            # Verify it started — polling beats the old fixed 3s sleep the
+            # moment the session shows up
+            is_alive = self._wait_for_screen(screen_name, expected=True, timeout=5.0)
 
             history.append((now, is_alive))
-            self.restart_history[bot_name] = history
 
             if is_alive:
                 self.logger.info(f"✅ Successfully restarted {bot_name}")
@@ -160,24 +284,47 @@ class Watchdog:
             return {
                 "success": is_alive,
                 "reason": "restarted" if is_alive else "start_failed",
-                "attempts": len(recent) + 1
+                "attempts": recent + 1
             }
 
         except Exception as e:
             self.logger.error(f"Restart error for {bot_name}: {e}")
             history.append((now, False))
-            self.restart_history[bot_name] = history
-            return {"success": False, "reason": str(e), "attempts": len(recent) + 1}
+            return {"success": False, "reason": str(e), "attempts": recent + 1}
 
-    def check_dashboard_alive(self, bot_config):
-        """Check if a bot's dashboard is responding"""
+    def check_dashboard_alive(self, bot_config, deep=False):
+        """Check if a bot's dashboard is responding.
+
+        The default probe is a bare TCP connect — enough to tell a listening
+        Flask from a dead one without rendering a dashboard page every pass.
+        deep=True does a full HTTP GET.
+        """
         port = bot_config.get("dashboard_port")
         if not port:
             return {"alive": False, "reason": "no_port_configured"}
 
+        if not deep:
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                    s.settimeout(0.1)
+                    if s.connect_ex(("127.0.0.1", port)) == 0:
+                        return {"alive": True}
+            except OSError:
+                pass
+            return {"alive": False, "reason": "connection_failed"}
+
+        if requests is None:
+            return {"alive": False, "reason": "requests_missing"}
+
         try:
-            import requests
-            resp = requests.get(f"http://localhost:{port}/", timeout=3)
+            if self._http is None:
+                # Keep-alive session: every probe was a fresh TCP handshake.
+                # maxsize matches the health-report thread pool
+                session = requests.Session()
+                session.mount("http://", requests.adapters.HTTPAdapter(
+                    pool_connections=1, pool_maxsize=8))
+                self._http = session
+            resp = self._http.get(f"http://localhost:{port}/", timeout=3)
             return {"alive": resp.status_code == 200, "status_code": resp.status_code}
         except:
             return {"alive": False, "reason": "connection_failed"}
@@ -186,29 +333,60 @@ class Watchdog:
         """Generate health report for all bots"""
         report = {}
 
+        # One `screen -ls` covers every bot in this pass
+        try:
+            self._list_screens(max_age=0.0)
+        except Exception as e:
+            self.logger.error(f"Screen check error: {e}")
+
+        enabled = []
         for bot_name, bot_config in bots_config.items():
             if not bot_config.get("enabled", True):
                 report[bot_name] = {"status": "disabled"}
-                continue
-
-            process = self.check_process_alive(bot_name, bot_config)
-            db = self.check_db_freshness(bot_name, bot_config)
-            dashboard = self.check_dashboard_alive(bot_config)
-
-            # Overall health
-            if not process["alive"]:
-                health = "DEAD"
-            elif not db["fresh"]:
-                health = "STALE"
             else:
-                health = "HEALTHY"
-
-            report[bot_name] = {
-                "health": health,
-                "process": process,
-                "database": db,
-                "dashboard": dashboard,
-                "checked_at": datetime.now(timezone.utc).isoformat()
+                enabled.append((bot_name, bot_config))
+
+        if not enabled:
+            return report
+
+        # One clock read and one isoformat for the whole pass instead of
+        # two per bot
+        now_utc = datetime.now(timezone.utc)
+        checked_at = now_utc.isoformat()
+
+        # Every probe is I/O-bound, so all of them — process, database and
+        # dashboard for every bot — go to the pool as one flat batch and the
+        # pass takes the slowest single probe's time instead of the sum
+        with ThreadPoolExecutor(max_workers=min(8, 3 * len(enabled))) as pool:
+            futures = {
+                bot_name: (
+                    pool.submit(self.check_process_alive, bot_name, bot_config,
+                                checked_at),
+                    pool.submit(self.check_db_freshness, bot_name, bot_config,
+                                now_utc),
+                    pool.submit(self.check_dashboard_alive, bot_config),
+                )
+                for bot_name, bot_config in enabled
             }
+            for bot_name, (proc_f, db_f, dash_f) in futures.items():
+                process = proc_f.result()
+                db = db_f.result()
+                dashboard = dash_f.result()
+
+                # Overall health
+                if not process["alive"]:
+                    health = "DEAD"
+                elif not db["fresh"]:
+                    health = "STALE"
+                else:
+                    health = "HEALTHY"
+
+                report[bot_name] = {
+                    "health": health,
+                    "process": process,
+                    "database": db,
+                    "dashboard": dashboard,
+                    "checked_at": checked_at
+                }
 
         return report
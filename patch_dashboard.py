@@ -16,13 +16,12 @@ if "renderFutures" in content:
     print("Already patched!")
     exit(0)
 
-# 1. Add Futures tab button
-content = content.replace(
-    '<div class="tab" data-tab="global">Global</div>',
-    '<div class="tab" data-tab="futures">Futures</div>\n    <div class="tab" data-tab="global">Global</div>'
-)
+# 1. Futures tab button goes right before the Global tab
+TAB_ANCHOR = '<div class="tab" data-tab="global">Global</div>'
+TAB_INSERT = '<div class="tab" data-tab="futures">Futures</div>\n    '
 
-# 2. Add renderFutures function before renderGlobal
+# 2. renderFutures function goes right before renderGlobal
+RENDER_ANCHOR = 'function renderGlobal(state) {'
 futures_render = '''
 function renderFutures(state) {
     const ft = state.futures || {};
@@ -152,29 +151,43 @@ function renderFutures(state) {
 
 '''
 
-content = content.replace(
-    'function renderGlobal(state) {',
-    futures_render + 'function renderGlobal(state) {'
-)
-
 # 3. Add futures to the refresh/tab rendering logic
-content = content.replace(
-    """if (currentTab === 'polymarket') {
+DISPATCH_OLD = """if (currentTab === 'polymarket') {
             content.innerHTML = renderPolymarket(state);
         } else {
             content.innerHTML = renderGlobal(state);
-        }""",
-    """if (currentTab === 'polymarket') {
+        }"""
+DISPATCH_NEW = """if (currentTab === 'polymarket') {
             content.innerHTML = renderPolymarket(state);
         } else if (currentTab === 'futures') {
             content.innerHTML = renderFutures(state);
         } else {
             content.innerHTML = renderGlobal(state);
         }"""
-)
+
+# Locate all three anchors first, then stitch the patched file together
+# in one join — each str.replace was another full-file scan and copy,
+# and a missing anchor now fails loudly instead of silently half-patching
+try:
+    splices = sorted([
+        (content.index(TAB_ANCHOR), 0, TAB_INSERT),
+        (content.index(RENDER_ANCHOR), 0, futures_render),
+        (content.index(DISPATCH_OLD), len(DISPATCH_OLD), DISPATCH_NEW),
+    ])
+except ValueError:
+    print("❌ Anchor not found — has dashboard.py changed? Nothing written.")
+    exit(1)
+
+parts = []
+pos = 0
+for at, skip, text in splices:
+    parts.append(content[pos:at])
+    parts.append(text)
+    pos = at + skip
+parts.append(content[pos:])
 
 with open(DASHBOARD_PATH, "w") as f:
-    f.write(content)
+    f.write("".join(parts))
 
 print("✅ Dashboard patched — Futures tab added!")
 print("Restart Jarvis to see changes: sudo systemctl restart jarvis")